@@ -1,9 +1,20 @@
 import streamlit as st
 import pandas as pd
-from resume_analyzer import resume_analyzer_app, extract_text_from_file
+from resume_analyzer import (extract_text_from_file, extract_texts_parallel, prepare_job, analyze_file, StageProfiler,
+                             generate_llm_feedback)
+from step3c_utils import extraction_signature
+from step3h_llm_feedback_node import LLM_FEEDBACK_ENABLED
+from result_cache import ResultCache, PIPELINE_VERSION, hash_bytes
+from step3e_semantic_node import embedding_signature
+from skill_matcher import skill_matching_signature
+from export import export_bytes, score_row_format, EXPORT_MIME_TYPES
+from step3f_scoring_node import DEFAULT_WEIGHTS, signals_frame, rescore
+from dedup import DuplicateIndex
 import plotly.graph_objects as go
 import time
-import io
+import queue
+import contextlib
+import threading
 from datetime import datetime
 
 st.set_page_config(
@@ -277,6 +288,151 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_result_cache():
+    """Persistent result cache shared by every session"""
+    # Chunked and truncated embeddings (or exact and semantic skill matching) score
+    # differently, so they never share entries; neither do texts cut at different
+    # extraction budgets
+    return ResultCache(version=f"{PIPELINE_VERSION}:{extraction_signature()}:{embedding_signature()}:"
+                               f"{skill_matching_signature()}")
+
+def run_analysis(pending, prepared_job, result_cache, events, stop_event, profiler=None, ai_feedback=False):
+    """Background producer: analyze pending resumes and push events onto a queue
+
+    Runs outside the Streamlit script thread, so it must not call any st.* function.
+    Each resume is scored as soon as its text is available (cached texts first, then
+    extractions as they finish), so the first results show up while the rest are still
+    being parsed; stop_event is checked between resumes. With a StageProfiler, per-stage
+    timings of every resume are recorded on it. With ai_feedback, LLM feedback for all
+    analyzed resumes is requested concurrently at the end. Duplicate and near-duplicate
+    resumes are analyzed once; the others get a copy of that result marked with duplicate_of.
+    """
+    analyzed = []
+    results_by_index = {}
+    total_files = len(pending)
+    duplicate_index = DuplicateIndex()
+
+    def analyze(i, text, error):
+        # Score one resume and push its event; returns the new analysis, or None. A duplicate
+        # of a resume seen earlier gets a copy of that result instead of being analyzed
+        filename, resume_bytes, resume_hash = pending[i]
+        if error:
+            events.put({"type": "error", "text": f"❌ Error processing {filename}: {error}"})
+            return None
+
+        original = duplicate_index.check(i, text, resume_hash) if text is not None else None
+        if original is not None:
+            # Fan the original's result out instead of analyzing the same resume again
+            original_result = results_by_index.get(original)
+            if original_result is None:
+                events.put({"type": "warning", "text": f"⚠️ Skipping {filename} - duplicate of {pending[original][0]}, which could not be analyzed"})
+            else:
+                duplicate_result = dict(original_result, resume_filename=filename, duplicate_of=original_result['resume_filename'])
+                events.put({"type": "result", "result": duplicate_result, "resume_hash": resume_hash})
+            return None
+
+        try:
+            # Analyze RESUME against JD, reusing cached text, embedding and result
+            with profiler.track(filename) if profiler is not None else contextlib.nullcontext():
+                # AI feedback is requested for the whole batch at the end, not one resume at a time
+                analysis_result = analyze_file(resume_bytes, filename, prepared_job, cache=result_cache, resume_text=text,
+                                               llm_feedback=False)
+
+            if analysis_result is None:
+                events.put({"type": "warning", "text": f"⚠️ Skipping {filename} - insufficient text content"})
+                return None
+
+            # Add file information - CORRECTED (resume file name)
+            analysis_result['resume_filename'] = filename  # Store resume filename
+            analysis_result['processed_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+
+            events.put({"type": "result", "result": analysis_result, "resume_hash": resume_hash})
+            results_by_index[i] = analysis_result
+            return analysis_result
+
+        except Exception as e:
+            events.put({"type": "error", "text": f"❌ Error processing {filename}: {str(e)}"})
+            return None
+
+    try:
+        # Byte-identical files are extracted once; their copies follow the first one
+        copies, cached, to_extract = {}, [], []
+        for i, (_, _, resume_hash) in enumerate(pending):
+            if resume_hash in copies:
+                copies[resume_hash].append(i)
+                continue
+            copies[resume_hash] = []
+            text = result_cache.get_text(resume_hash)
+            if text is not None:
+                cached.append((i, text))
+            else:
+                to_extract.append(i)
+
+        def available_texts():
+            # (index, text, error) as each text becomes available
+            for i, text in cached:
+                yield i, text, None
+            if to_extract:
+                files = [(pending[i][1], pending[i][0]) for i in to_extract]
+                with contextlib.closing(extract_texts_parallel(files, profile=profiler is not None)) as extractions:
+                    for extraction in extractions:
+                        if profiler is not None:
+                            profiler.add(extraction["stages"])
+                        yield to_extract[extraction['index']], extraction['text'], extraction['error']
+
+        done = 0
+        with contextlib.closing(available_texts()) as texts:
+            for first, text, error in texts:
+                for i in [first] + copies[pending[first][2]]:
+                    if stop_event.is_set():
+                        break
+                    events.put({"type": "status", "text": f"🔍 Analyzing {done + 1}/{total_files}: {pending[i][0]}",
+                                "progress": done / total_files})
+                    done += 1
+                    result = analyze(i, text, error)
+                    if result is not None:
+                        analyzed.append(result)
+                if stop_event.is_set():
+                    # Leaving the loop closes the generators, which cancels the extractions not yet started
+                    break
+
+        if ai_feedback and analyzed and not stop_event.is_set():
+            events.put({"type": "status", "text": f"🤖 Requesting AI feedback for {len(analyzed)} resumes...", "progress": 1.0})
+            with profiler.track() if profiler is not None else contextlib.nullcontext():
+                feedbacks = generate_llm_feedback(analyzed, cache=result_cache)
+            for result, feedback in zip(analyzed, feedbacks):
+                events.put({"type": "ai_feedback", "filename": result['resume_filename'], "text": feedback})
+    except Exception as e:
+        events.put({"type": "error", "text": f"❌ Analysis stopped: {str(e)}"})
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        events.put({"type": "done"})
+
+def drain_analysis_events():
+    """Move finished results from the background worker into session state"""
+    events = st.session_state.analysis_events
+    while True:
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            break
+        if event["type"] == "result":
+            st.session_state.analysis_results.append(event["result"])
+            st.session_state.results_version += 1
+            st.session_state.processed_files.add(event["resume_hash"])
+            st.session_state.analysis_status["processed"] += 1
+        elif event["type"] == "status":
+            st.session_state.analysis_status["text"] = event["text"]
+            st.session_state.analysis_status["progress"] = event.get("progress", st.session_state.analysis_status["progress"])
+        elif event["type"] == "ai_feedback":
+            st.session_state.ai_feedback[event["filename"]] = event["text"]
+        elif event["type"] in ("warning", "error"):
+            st.session_state.analysis_messages.append((event["type"], event["text"]))
+        elif event["type"] == "done":
+            st.session_state.analysis_events = None
+
 def main():
     # Premium Header Section
     st.markdown("""
@@ -346,6 +502,18 @@ def main():
         st.session_state.job_description = ""
     if 'processed_files' not in st.session_state:
         st.session_state.processed_files = set()
+    if 'export_cache' not in st.session_state:
+        # Bumped whenever analysis_results changes; keys the cached export file
+        st.session_state.results_version = 0
+        st.session_state.export_cache = {}
+        st.session_state.signals_cache = (None, None)
+    if 'analysis_events' not in st.session_state:
+        st.session_state.analysis_events = None
+        st.session_state.analysis_stop = threading.Event()
+        st.session_state.analysis_messages = []
+        st.session_state.analysis_status = {"text": "", "progress": 0.0, "processed": 0}
+        st.session_state.analysis_profiler = None
+        st.session_state.ai_feedback = {}
 
     # Main Input Section - CORRECTED LOGIC
     st.markdown("---")
@@ -420,75 +588,134 @@ def main():
             Reset analysis and start fresh
         </div>
         """, unsafe_allow_html=True)
+
+    ai_feedback = st.checkbox(
+        "🤖 AI feedback",
+        value=LLM_FEEDBACK_ENABLED,
+        help="Ask the Groq LLM for written feedback on each candidate once analysis finishes (requests run concurrently and are cached)"
+    )
+    collect_diagnostics = st.checkbox(
+        "🩺 Collect diagnostics",
+        help="Record wall time, CPU time and peak memory of each pipeline stage for every resume (slower)"
+    )
     
     # Handle clear button
     if clear_btn:
+        if st.session_state.analysis_events is not None:
+            st.session_state.analysis_stop.set()
+            st.session_state.analysis_events = None
         st.session_state.analysis_results = []
+        st.session_state.results_version += 1
         st.session_state.processed_files = set()
+        st.session_state.analysis_messages = []
+        st.session_state.analysis_status = {"text": "", "progress": 0.0, "processed": 0}
+        st.session_state.analysis_profiler = None
+        st.session_state.ai_feedback = {}
         st.rerun()
 
-    # Process Analysis - CORRECTED LOGIC
-    if analyze_all and uploaded_resumes and st.session_state.job_description:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        results = []
-        total_files = len(uploaded_resumes)
-
-        for i, resume_file in enumerate(uploaded_resumes):
-            # Skip if already processed
-            if resume_file.name in st.session_state.processed_files:
-                continue
-
-            status_text.text(f"🔍 Analyzing {i+1}/{total_files}: {resume_file.name}")
-            progress_bar.progress((i) / total_files)
-
-            try:
-                # Extract text from RESUME (not JD) - CORRECTED
-                resume_text = extract_text_from_file(resume_file.getvalue(), resume_file.name)
-
-                if not resume_text or len(resume_text.strip()) < 50:
-                    st.warning(f"⚠️ Skipping {resume_file.name} - insufficient text content")
-                    continue
-
-                # Analyze resume against JD - CORRECTED
-                analysis_result = resume_analyzer_app.invoke({
-                    "resume_text": resume_text,  # This is the candidate's resume
-                    "job_description": st.session_state.job_description  # This is the JD
-                })
-
-                # Add file information - CORRECTED (resume file name)
-                analysis_result['resume_filename'] = resume_file.name  # Store resume filename
-                analysis_result['processed_date'] = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-                results.append(analysis_result)
-                st.session_state.processed_files.add(resume_file.name)
-
-            except Exception as e:
-                st.error(f"❌ Error processing {resume_file.name}: {str(e)}")
-
-        # Update session state
-        st.session_state.analysis_results.extend(results)
-
-        progress_bar.progress(100)
-        status_text.text(f"✅ Analysis complete! Processed {len(results)} resumes")
-        time.sleep(1)
-        st.rerun()
+    # Start Analysis in a background worker so results stream in as they finish
+    if analyze_all and uploaded_resumes and st.session_state.job_description and st.session_state.analysis_events is None:
+        # Analyze the JD once for the whole batch
+        prepared_job = prepare_job(st.session_state.job_description)
+
+        # Skip files whose content was already processed, whatever their name
+        pending = []
+        for resume_file in uploaded_resumes:
+            resume_bytes = resume_file.getvalue()
+            resume_hash = hash_bytes(resume_bytes)
+            if resume_hash not in st.session_state.processed_files:
+                pending.append((resume_file.name, resume_bytes, resume_hash))
+
+        st.session_state.analysis_events = queue.Queue()
+        st.session_state.analysis_stop = threading.Event()
+        st.session_state.analysis_messages = []
+        st.session_state.analysis_status = {"text": "🔍 Starting analysis...", "progress": 0.0, "processed": 0}
+        st.session_state.analysis_profiler = StageProfiler(track_memory=True) if collect_diagnostics else None
+        threading.Thread(
+            target=run_analysis,
+            args=(pending, prepared_job, get_result_cache(), st.session_state.analysis_events, st.session_state.analysis_stop,
+                  st.session_state.analysis_profiler, ai_feedback),
+            daemon=True
+        ).start()
+
+    analysis_running = st.session_state.analysis_events is not None
+    if analysis_running:
+        drain_analysis_events()
+        analysis_running = st.session_state.analysis_events is not None
+
+    if analysis_running:
+        st.progress(st.session_state.analysis_status["progress"])
+        st.text(st.session_state.analysis_status["text"])
+    elif st.session_state.analysis_status["processed"]:
+        st.success(f"✅ Analysis complete! Processed {st.session_state.analysis_status['processed']} resumes")
+
+    for level, message in st.session_state.analysis_messages:
+        if level == "warning":
+            st.warning(message)
+        else:
+            st.error(message)
+
+    profiler = st.session_state.analysis_profiler
+    if profiler is not None and profiler.records:
+        with st.expander("🩺 Diagnostics"):
+            st.caption("Resumes served from the result cache run no stages and are not listed.")
+            st.dataframe(pd.DataFrame(profiler.summary()).round(3), use_container_width=True, hide_index=True)
+            per_resume = pd.DataFrame(profiler.records).pivot_table(
+                index="resume", columns="stage", values="wall_s", aggfunc="sum") * 1000
+            st.markdown("**Wall time per resume (ms)**")
+            st.dataframe(per_resume.round(2), use_container_width=True)
+            st.download_button("📥 Download metrics (Prometheus text)", profiler.prometheus_text(),
+                               file_name="resume_analyzer_metrics.prom", mime="text/plain")
 
     # Display Results - UPDATED: Only 4 columns
     if st.session_state.analysis_results:
         st.markdown("---")
         st.markdown("## 📊 Candidate Analysis Results")
 
+        # Scoring controls: results keep their raw signals, so changing a weight re-ranks
+        # everything at once without re-running extraction or embeddings
+        with st.expander("⚖️ Scoring Weights"):
+            weight_cols = st.columns(4)
+            weights = {
+                "semantic": weight_cols[0].slider("Experience relevance", 0.0, 1.0, DEFAULT_WEIGHTS["semantic"], 0.05),
+                "keyword": weight_cols[1].slider("Skill match", 0.0, 1.0, DEFAULT_WEIGHTS["keyword"], 0.05),
+                "experience": weight_cols[2].slider("Years of experience", 0.0, 1.0, DEFAULT_WEIGHTS["experience"], 0.05),
+            }
+            strong_match_cutoff = weight_cols[3].slider("Strong match cutoff (%)", 0, 100, 70, 5)
+            st.caption("Weights are normalized to sum to 1.")
+
+        if st.session_state.signals_cache[0] != st.session_state.results_version:
+            st.session_state.signals_cache = (st.session_state.results_version,
+                                              signals_frame(st.session_state.analysis_results))
+        scores = rescore(st.session_state.signals_cache[1], weights)["match_percentage"]
+
+        # Duplicate resumes share their original's result; collapsed, they are listed on its row
+        duplicates_of = {}
+        for result in st.session_state.analysis_results:
+            if result.get('duplicate_of'):
+                duplicates_of.setdefault(result['duplicate_of'], []).append(result['resume_filename'])
+        collapse_duplicates = bool(duplicates_of) and st.checkbox(
+            "🧬 Collapse duplicates", value=True,
+            help="Show re-submitted and near-identical resumes once, on the row of the first copy analyzed"
+        )
+
         # Create results dataframe - UPDATED: Only 4 columns as requested
         results_data = []
-        for result in st.session_state.analysis_results:
-            results_data.append({
+        for result, score in zip(st.session_state.analysis_results, scores):
+            if collapse_duplicates and result.get('duplicate_of'):
+                continue
+            row = {
                 'Resume File': result.get('resume_filename', 'Unknown'),
-                'Overall Fit Score': f"{result['match_percentage']}%",
+                'Overall Fit Score': f"{score}%",
                 'Experience Relevance': f"{int(result['semantic_similarity'] * 100)}%",
                 'Missing Skills': ', '.join(result.get('missing_skills', []))[:80] + ('...' if len(', '.join(result.get('missing_skills', []))) > 80 else '') if result.get('missing_skills') else 'None'
-            })
+            }
+            if duplicates_of:
+                if result.get('duplicate_of'):
+                    row['Duplicates'] = f"Duplicate of {result['duplicate_of']}"
+                else:
+                    row['Duplicates'] = ', '.join(duplicates_of.get(row['Resume File'], []))
+            results_data.append(row)
 
         df = pd.DataFrame(results_data)
 
@@ -519,7 +746,7 @@ def main():
             """, unsafe_allow_html=True)
 
         with col3:
-            strong_matches = len(df[df['Overall Fit Score'].str.replace('%', '').astype(float) >= 70])
+            strong_matches = len(df[df['Overall Fit Score'].str.replace('%', '').astype(float) >= strong_match_cutoff])
             st.markdown(f"""
             <div class='metric-card'>
                 <div class='metric-value'>{strong_matches}</div>
@@ -529,7 +756,7 @@ def main():
 
         with col4:
             # FIXED: Changed to calculate weak matches correctly (<70%)
-            weak_matches = len(df[df['Overall Fit Score'].str.replace('%', '').astype(float) < 70])
+            weak_matches = len(df[df['Overall Fit Score'].str.replace('%', '').astype(float) < strong_match_cutoff])
             st.markdown(f"""
             <div class='metric-card'>
                 <div class='metric-value'>{weak_matches}</div>
@@ -541,12 +768,12 @@ def main():
         st.markdown("### 👥 Candidate Comparison Table")
         
         # Add legend
-        st.markdown("""
+        st.markdown(f"""
         <div class='legend-container'>
             <strong style='font-size: 1.1rem; color: #2F4F4F;'>📊 Match Score Legend:</strong>
             <div style='margin-top: 0.5rem;'>
-                <span class='legend-item legend-strong'>✅ Strong Match: ≥70% - Highly Recommended</span>
-                <span class='legend-item legend-weak'>⚠️ Weak Match: <70% - Needs Review</span>
+                <span class='legend-item legend-strong'>✅ Strong Match: ≥{strong_match_cutoff}% - Highly Recommended</span>
+                <span class='legend-item legend-weak'>⚠️ Weak Match: <{strong_match_cutoff}% - Needs Review</span>
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -554,7 +781,7 @@ def main():
         # Add styling to table based on match score
         def color_rows(row):
             score = float(row['Overall Fit Score'].replace('%', ''))
-            if score >= 70:
+            if score >= strong_match_cutoff:
                 return ['background-color: #d4edda'] * len(row)
             else:
                 return ['background-color: #f8d7da'] * len(row)
@@ -562,44 +789,40 @@ def main():
         styled_df = df.style.apply(color_rows, axis=1)
         st.dataframe(styled_df, use_container_width=True, height=400)
 
-        # Download results - UPDATED: Only Excel export
-        st.markdown("### 📥 Export Results")
-
-        # Create Excel file with formatting
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='Resume Analysis', index=False)
-
-            # Get workbook and worksheet
-            workbook = writer.book
-            worksheet = writer.sheets['Resume Analysis']
-
-            # Add formats
-            high_match_format = workbook.add_format({'bg_color': '#d4edda'})
-            low_match_format = workbook.add_format({'bg_color': '#f8d7da'})
-
-            # Apply formatting based on match score
-            for row_num in range(1, len(df) + 1):
-                score = float(df.iloc[row_num-1]['Overall Fit Score'].replace('%', ''))
-                if score >= 70:
-                    worksheet.set_row(row_num, None, high_match_format)
-                else:
-                    worksheet.set_row(row_num, None, low_match_format)
+        if st.session_state.ai_feedback:
+            with st.expander(f"🤖 AI Feedback ({len(st.session_state.ai_feedback)} candidates)"):
+                for resume_file in df['Resume File']:
+                    feedback = st.session_state.ai_feedback.get(resume_file)
+                    if feedback:
+                        st.markdown(f"**{resume_file}**")
+                        st.markdown(feedback)
 
-            # Auto-adjust column widths
-            for i, col in enumerate(df.columns):
-                max_len = max(df[col].astype(str).str.len().max(), len(col)) + 2
-                worksheet.set_column(i, i, min(max_len, 50))
+        # Download results: the file is written only when the button is clicked, streamed
+        # row by row, and reused until the results or the chosen format change
+        st.markdown("### 📥 Export Results")
+        export_labels = {"xlsx": "Excel", "csv": "CSV", "parquet": "Parquet"}
+        export_format = st.radio("Export format", list(export_labels), format_func=export_labels.get, horizontal=True)
+        export_key = (st.session_state.results_version, export_format, tuple(weights.values()), strong_match_cutoff,
+                      collapse_duplicates)
+        export_cache = st.session_state.export_cache
+        export_columns = list(df.columns)
+
+        def build_export():
+            # Runs on a separate thread when the download starts, so no st.* calls here
+            cached = export_cache.get("entry")
+            if cached is None or cached[0] != export_key:
+                rows = (dict(zip(export_columns, values)) for values in df.itertuples(index=False, name=None))
+                cached = (export_key, export_bytes(rows, export_columns, export_format,
+                                                   score_row_format('Overall Fit Score', strong_match_cutoff)))
+                export_cache["entry"] = cached
+            return cached[1]
 
-        excel_data = output.getvalue()
-        
-        # Attractive download button
         st.markdown('<div class="download-btn-container">', unsafe_allow_html=True)
         st.download_button(
-            label="📊 Download Excel Report",
-            data=excel_data,
-            file_name=f"resume_analysis_results_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-            mime="application/vnd.ms-excel",
+            label=f"📊 Download {export_labels[export_format]} Report",
+            data=build_export,
+            file_name=f"resume_analysis_results_{datetime.now().strftime('%Y%m%d_%H%M')}.{export_format}",
+            mime=EXPORT_MIME_TYPES[export_format],
             use_container_width=False,
             type="primary"
         )
@@ -655,5 +878,10 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    # Poll the background worker: rerun shortly so new results show up incrementally
+    if analysis_running:
+        time.sleep(0.5)
+        st.rerun()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,419 @@
+import os
+import json
+import logging
+import multiprocessing
+import argparse
+import contextlib
+import pandas as pd
+from tqdm import tqdm
+from resume_analyzer import (analyze_batch, analyze_indexed, prepare_job, extract_text_from_file,
+                             extract_texts_parallel, ResumeIndex, StageProfiler, generate_llm_feedback)
+from result_cache import ResultCache, hash_text, hash_file
+from export import write_export, score_row_format, WRITERS
+from step3c_utils import FEEDBACK_THRESHOLDS
+from step3f_scoring_node import DEFAULT_WEIGHTS, signals_frame, rescore
+from dedup import DuplicateIndex, DEFAULT_THRESHOLD
+from job_queue import JobQueue, run_worker
+from worker_pool import PipelinePool, warm_up, prepare_fork
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.txt')
+REPORT_COLUMNS = ['Resume File', 'Candidate Name', 'Overall Fit Score', 'Experience Relevance', 'Total Experience',
+                  'Current Position', 'Education', 'Missing Skills', 'Feedback', 'Path']
+
+def find_resumes(directory):
+    """All resume files under a directory, in a stable order"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+def load_checkpoint(path, job_hash):
+    """Records already written for this job description, keyed by resume path"""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line; that file is simply redone
+                continue
+            if record.get("job_hash") == job_hash:
+                done[record["path"]] = record
+    return done
+
+def results_to_rows(records, collapse_duplicates=False):
+    """Flatten checkpoint records into report rows, best match first"""
+    rows = []
+    for record in records:
+        result = record.get("result")
+        if result is None or (collapse_duplicates and result.get('duplicate_of')):
+            continue
+        rows.append({
+            'Resume File': os.path.basename(record["path"]),
+            'Candidate Name': result.get('candidate_name', ''),
+            'Overall Fit Score': result['match_percentage'],
+            'Experience Relevance': int(result['semantic_similarity'] * 100),
+            'Total Experience': result.get('total_experience', 0),
+            'Current Position': result.get('current_position', ''),
+            'Education': ' ; '.join(result.get('education', [])),
+            'Missing Skills': ', '.join(result.get('missing_skills', [])) or 'None',
+            'Feedback': result.get('general_feedback', ''),
+            'Path': record["path"],
+            'AI Feedback': result.get('ai_feedback', ''),
+            'Duplicate Of': result.get('duplicate_of', '')
+        })
+    rows.sort(key=lambda row: row['Overall Fit Score'], reverse=True)
+    return rows
+
+def write_results(records, out_path, collapse_duplicates=False):
+    """Stream the ranked report to .xlsx, .csv or .parquet depending on the extension"""
+    fmt = os.path.splitext(out_path)[1].lstrip('.').lower()
+    rows = results_to_rows(records, collapse_duplicates)
+    columns = REPORT_COLUMNS + [column for column in ('AI Feedback', 'Duplicate Of') if any(row[column] for row in rows)]
+    return write_export(rows, columns, out_path, fmt if fmt in WRITERS else 'xlsx',
+                        row_format=score_row_format('Overall Fit Score'))
+
+def screen(jd_path, resumes_dir, out_path, checkpoint_path=None, workers=None,
+           batch_size=32, chunk_size=64, timeout=60, profiler=None, metrics_path=None, ai_feedback=False,
+           dedup=True, near_duplicate_threshold=DEFAULT_THRESHOLD, collapse_duplicates=False, pool=None):
+    """Screen every resume in a directory against one JD, resuming from the checkpoint
+
+    With a StageProfiler, per-stage metrics are collected and, given metrics_path,
+    rewritten after every chunk. ai_feedback adds LLM-written feedback, requested
+    concurrently for each chunk and cached on disk. With dedup, resumes whose text
+    duplicates or nearly duplicates one screened earlier in the run are not analyzed
+    again; they get a copy of its result with duplicate_of set to its path, and
+    byte-identical copies are recognised by file hash before they are extracted. With a
+    worker_pool.PipelinePool, each chunk is extracted and analyzed in its worker
+    processes (their stages are not profiled, and workers is ignored); near-duplicates
+    are then only recognised after they were analyzed, and get the original's result.
+    """
+    job_description = read_job_description(jd_path)
+    job = prepare_job(job_description)
+    job_hash = hash_text(job_description)
+
+    checkpoint_path = checkpoint_path or out_path + '.checkpoint.jsonl'
+    llm_cache = ResultCache() if ai_feedback else None
+    done = load_checkpoint(checkpoint_path, job_hash)
+    paths = find_resumes(resumes_dir)
+    todo = [path for path in paths if path not in done]
+    duplicate_index = DuplicateIndex(near_duplicate_threshold) if dedup else None
+
+    with tqdm(total=len(paths), initial=len(paths) - len(todo), unit='resume') as progress, \
+            open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+        for start in range(0, len(todo), chunk_size):
+            chunk = todo[start:start + chunk_size]
+            records = []
+            valid = []
+            duplicates = []
+
+            # Byte-identical files are caught by hash before any work: a copy of a resume
+            # screened in an earlier chunk is not extracted at all, and copies within this
+            # chunk wait for the first one
+            byte_hashes, to_extract, copies, first_by_hash, errors = {}, [], [], {}, {}
+            for path in chunk:
+                if duplicate_index is None:
+                    to_extract.append(path)
+                    continue
+                try:
+                    byte_hashes[path] = hash_file(path)
+                except OSError as e:
+                    errors[path] = f"{type(e).__name__}: {e}"
+                    tqdm.write(f"❌ {path}: {errors[path]}")
+                    continue
+                original = duplicate_index.check_bytes(byte_hashes[path])
+                if original is not None:
+                    duplicates.append((path, original))
+                elif byte_hashes[path] in first_by_hash:
+                    copies.append((path, first_by_hash[byte_hashes[path]]))
+                else:
+                    first_by_hash[byte_hashes[path]] = path
+                    to_extract.append(path)
+
+            # Text extraction fans out across processes; failures are recorded, not fatal. With a
+            # pool, its workers extract and analyze each file, and valid texts come back scored
+            def extract(paths):
+                if pool is not None:
+                    outcomes = pool.analyze_files([(path, path) for path in paths], job, batch_size=batch_size,
+                                                  timeout=timeout)
+                else:
+                    outcomes = extract_texts_parallel([(path, path) for path in paths], max_workers=workers,
+                                                      timeout=timeout, profile=profiler is not None)
+                for outcome in outcomes:
+                    path, text = outcome["filename"], outcome["text"]
+                    if profiler is not None and pool is None:
+                        profiler.add(outcome["stages"])
+                    if outcome["error"]:
+                        errors[path] = outcome["error"]
+                        tqdm.write(f"❌ {path}: {outcome['error']}")
+                    elif not text or len(text.strip()) < 50:
+                        errors[path] = "insufficient text content"
+                        tqdm.write(f"⚠️ Skipping {path} - insufficient text content")
+                    else:
+                        original = duplicate_index.check(path, text, byte_hashes[path]) if duplicate_index is not None else None
+                        if original is not None:
+                            # Already analyzed when it came from the pool; the original's result is used instead
+                            duplicates.append((path, original))
+                        else:
+                            valid.append((path, text, outcome.get("result")))
+
+            extract(to_extract)
+            # A copy whose original failed is extracted itself: under another extension (a PDF
+            # saved as .txt) it may parse, and either way its error must be its own
+            extract([path for path, first in copies if first in errors])
+            for path, first in copies:
+                if first not in errors:
+                    duplicates.append((path, duplicate_index.check_bytes(byte_hashes[path])))
+            records += [{"job_hash": job_hash, "path": path, "result": None, "error": error} for path, error in errors.items()]
+
+            if valid:
+                results = [result for _, _, result in valid]
+                if pool is None:
+                    with profiler.track("batch") if profiler is not None else contextlib.nullcontext():
+                        results = analyze_batch([text for _, text, _ in valid], job, batch_size=batch_size,
+                                                resume_ids=[path for path, _, _ in valid])
+                if ai_feedback:
+                    for result, feedback in zip(results, generate_llm_feedback(results, cache=llm_cache)):
+                        result["ai_feedback"] = feedback
+                for (path, _, _), result in zip(valid, results):
+                    result.pop("prepared_job", None)
+                    records.append({"job_hash": job_hash, "path": path, "result": result, "error": None})
+
+            # Originals are always screened before their duplicates, in this chunk or an earlier one
+            results_by_path = {record["path"]: record["result"] for record in records}
+            for path, original in duplicates:
+                result = dict(results_by_path.get(original) or done[original]["result"], duplicate_of=original)
+                records.append({"job_hash": job_hash, "path": path, "result": result, "error": None})
+
+            for record in records:
+                checkpoint.write(json.dumps(record) + '\n')
+                done[record["path"]] = record
+            checkpoint.flush()
+            progress.update(len(chunk))
+            if profiler is not None and metrics_path:
+                profiler.write(metrics_path)
+
+    return write_results([done[path] for path in paths if path in done], out_path, collapse_duplicates)
+
+def rescore_checkpoint(checkpoint_path, out_path, weights=None, thresholds=FEEDBACK_THRESHOLDS, collapse_duplicates=False):
+    """Re-rank a screening run from its checkpoint with new weights or thresholds
+
+    Only the stored score signals are used, so nothing is extracted or embedded again.
+    When the checkpoint holds several job descriptions, the last one screened is used.
+    """
+    records = {}
+    job_hash = None
+    with open(checkpoint_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            job_hash = record.get("job_hash")
+            records.setdefault(job_hash, {})[record["path"]] = record
+    records = [record for record in records.get(job_hash, {}).values() if record.get("result")]
+
+    if records:
+        scored = rescore(signals_frame([record["result"] for record in records]), weights, thresholds)
+        for record, score, feedback in zip(records, scored["match_percentage"], scored["general_feedback"]):
+            record["result"]["match_percentage"] = float(score)
+            record["result"]["general_feedback"] = feedback
+    return write_results(records, out_path, collapse_duplicates)
+
+def read_job_description(jd_path):
+    with open(jd_path, 'rb') as f:
+        return extract_text_from_file(f.read(), jd_path)
+
+def build_index(resumes_dir, index_dir, workers=None, batch_size=32, chunk_size=256, timeout=60, rebuild=False):
+    """Extract and embed every resume not yet in the index; returns the number added
+
+    With rebuild, an index made with other embedding settings is replaced instead of refused.
+    """
+    index = ResumeIndex(index_dir, rebuild=rebuild)
+    todo = [path for path in find_resumes(resumes_dir) if path not in index]
+    added = 0
+
+    # Saved once at the end (or when interrupted), so each chunk only appends to the index
+    with tqdm(total=len(todo), unit='resume') as progress:
+        try:
+            for start in range(0, len(todo), chunk_size):
+                chunk = todo[start:start + chunk_size]
+                items = []
+                for extraction in extract_texts_parallel([(path, path) for path in chunk], max_workers=workers, timeout=timeout):
+                    path, text = extraction["filename"], extraction["text"]
+                    if extraction["error"]:
+                        tqdm.write(f"❌ {path}: {extraction['error']}")
+                    elif not text or len(text.strip()) < 50:
+                        tqdm.write(f"⚠️ Skipping {path} - insufficient text content")
+                    else:
+                        items.append((path, text, {"filename": os.path.basename(path)}))
+                added += index.add(items, batch_size=batch_size)
+                progress.update(len(chunk))
+        finally:
+            index.save()
+    return added
+
+def rank(jd_path, index_dir, out_path, top_k=50):
+    """Rank the indexed pool against a JD and write the top-k report"""
+    results = analyze_indexed(ResumeIndex(index_dir), read_job_description(jd_path), top_k=top_k)
+    return write_results([{"path": result["resume_id"], "result": result} for result in results], out_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m resume_analyzer', description='Headless bulk resume screening')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    screen_parser = commands.add_parser('screen', help='Screen a directory of resumes against a job description')
+    screen_parser.add_argument('--jd', required=True, help='Job description file (PDF, DOCX or TXT)')
+    screen_parser.add_argument('--resumes', required=True, help='Directory of resume files, searched recursively')
+    screen_parser.add_argument('--out', required=True, help='Report path (.xlsx, .csv or .parquet)')
+    screen_parser.add_argument('--checkpoint', help='Checkpoint file (default: <out>.checkpoint.jsonl)')
+    screen_parser.add_argument('--workers', type=int, default=None, help='Text extraction processes (default: CPU count; unused with --fork-workers)')
+    screen_parser.add_argument('--batch-size', type=int, default=32, help='Embedding batch size')
+    screen_parser.add_argument('--chunk-size', type=int, default=64, help='Resumes per checkpointed chunk')
+    screen_parser.add_argument('--timeout', type=int, default=60, help='Per-file extraction timeout in seconds')
+    screen_parser.add_argument('--fork-workers', type=int, default=0,
+                               help='Extract and analyze in this many processes forked after loading the model (0: in this process)')
+    screen_parser.add_argument('--ai-feedback', action='store_true',
+                               help='Add LLM-written feedback per candidate (needs GROQ_API_KEY; see LLM_CONCURRENCY)')
+    screen_parser.add_argument('--no-dedup', action='store_true', help='Analyze duplicate resumes separately')
+    screen_parser.add_argument('--near-duplicate-threshold', type=float, default=DEFAULT_THRESHOLD,
+                               help='Text similarity (0-1) at which resumes count as duplicates; 1 keeps exact copies only')
+    screen_parser.add_argument('--collapse-duplicates', action='store_true',
+                               help='Leave duplicates out of the report instead of listing them with a Duplicate Of column')
+    screen_parser.add_argument('--metrics', help='Write per-stage timings here (.prom for Prometheus text, else JSONL)')
+    screen_parser.add_argument('--track-memory', action='store_true', help='Also record peak memory per stage (slower)')
+    screen_parser.add_argument('--profile-resume', help='Resume path to profile stage by stage')
+    screen_parser.add_argument('--profile-out', default='resume_profile.prof',
+                               help='Profile output: .prof for cProfile/pstats, .html for pyinstrument')
+
+    index_parser = commands.add_parser('index', help='Add a directory of resumes to a persistent embedding index')
+    index_parser.add_argument('--resumes', required=True, help='Directory of resume files, searched recursively')
+    index_parser.add_argument('--index', required=True, help='Index directory')
+    index_parser.add_argument('--workers', type=int, default=None, help='Text extraction processes (default: CPU count)')
+    index_parser.add_argument('--batch-size', type=int, default=32, help='Embedding batch size')
+    index_parser.add_argument('--timeout', type=int, default=60, help='Per-file extraction timeout in seconds')
+    index_parser.add_argument('--rebuild', action='store_true',
+                              help='Re-embed everything if the index was built with other embedding settings')
+
+    rank_parser = commands.add_parser('rank', help='Rank an indexed resume pool against a job description')
+    rank_parser.add_argument('--jd', required=True, help='Job description file (PDF, DOCX or TXT)')
+    rank_parser.add_argument('--index', required=True, help='Index directory')
+    rank_parser.add_argument('--out', required=True, help='Report path (.xlsx, .csv or .parquet)')
+    rank_parser.add_argument('--top', type=int, default=50, help='Number of candidates to shortlist')
+
+    rescore_parser = commands.add_parser('rescore', help='Re-rank a finished screen with new weights or thresholds')
+    rescore_parser.add_argument('--checkpoint', required=True, help='Checkpoint file written by screen')
+    rescore_parser.add_argument('--out', required=True, help='Report path (.xlsx, .csv or .parquet)')
+    rescore_parser.add_argument('--weights', nargs=3, type=float, metavar=('SEMANTIC', 'KEYWORD', 'EXPERIENCE'),
+                                default=list(DEFAULT_WEIGHTS.values()), help='Signal weights (normalized to sum to 1)')
+    rescore_parser.add_argument('--thresholds', nargs=4, type=float, metavar=('STRONG', 'GOOD', 'MODERATE', 'LIMITED'),
+                                default=list(FEEDBACK_THRESHOLDS), help='Minimum match %% for each feedback band')
+    rescore_parser.add_argument('--collapse-duplicates', action='store_true', help='Leave duplicates out of the report')
+
+    submit_parser = commands.add_parser('submit', help='Queue a directory of resumes against a JD in a shared job queue')
+    submit_parser.add_argument('--queue', required=True, help='Queue database (SQLite file; see job_queue.JobQueue before sharing it across hosts)')
+    submit_parser.add_argument('--jd', required=True, help='Job description file (PDF, DOCX or TXT)')
+    submit_parser.add_argument('--resumes', required=True, help='Directory of resume files, searched recursively')
+
+    worker_parser = commands.add_parser('worker', help='Process queued resumes until stopped')
+    worker_parser.add_argument('--queue', required=True, help='Queue database')
+    worker_parser.add_argument('--processes', type=int, default=1, help='Worker processes to run on this machine')
+    worker_parser.add_argument('--chunk-size', type=int, default=32, help='Jobs claimed at a time')
+    worker_parser.add_argument('--batch-size', type=int, default=32, help='Embedding batch size')
+    worker_parser.add_argument('--extraction-workers', type=int, default=None,
+                               help='Text extraction processes per worker (default: CPU count / --processes)')
+    worker_parser.add_argument('--timeout', type=int, default=60, help='Per-file extraction timeout in seconds')
+    worker_parser.add_argument('--exit-when-empty', action='store_true', help='Stop once the queue is drained')
+
+    status_parser = commands.add_parser('status', help='Show queue backlog and throughput')
+    status_parser.add_argument('--queue', required=True, help='Queue database')
+    status_parser.add_argument('--retry-failed', action='store_true', help='Queue failed jobs again first')
+
+    collect_parser = commands.add_parser('collect', help='Write the report for the queued jobs of a JD finished so far')
+    collect_parser.add_argument('--queue', required=True, help='Queue database')
+    collect_parser.add_argument('--jd', required=True, help='Job description file the resumes were submitted with')
+    collect_parser.add_argument('--out', required=True, help='Report path (.xlsx, .csv or .parquet)')
+
+    serve_parser = commands.add_parser('serve', help='Run the HTTP scoring service (see service.py)')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--workers', type=int, default=1, help='Worker processes sharing the loaded model')
+
+    args = parser.parse_args(argv)
+    if args.command == 'screen':
+        profiler = None
+        if args.metrics or args.profile_resume or args.track_memory:
+            profiler = StageProfiler(track_memory=args.track_memory, profile_resume=args.profile_resume,
+                                     profile_path=args.profile_out)
+        with PipelinePool(args.fork_workers) if args.fork_workers else contextlib.nullcontext() as pool:
+            count = screen(args.jd, args.resumes, args.out, checkpoint_path=args.checkpoint, workers=args.workers,
+                           batch_size=args.batch_size, chunk_size=args.chunk_size, timeout=args.timeout,
+                           profiler=profiler, metrics_path=args.metrics, ai_feedback=args.ai_feedback,
+                           dedup=not args.no_dedup, near_duplicate_threshold=args.near_duplicate_threshold,
+                           collapse_duplicates=args.collapse_duplicates, pool=pool)
+        print(f"✅ Screening complete! Wrote {count} candidates to {args.out}")
+        if profiler is not None:
+            print(pd.DataFrame(profiler.summary()).to_string(index=False))
+    elif args.command == 'index':
+        added = build_index(args.resumes, args.index, workers=args.workers, batch_size=args.batch_size, timeout=args.timeout,
+                            rebuild=args.rebuild)
+        print(f"✅ Indexed {added} resumes into {args.index}")
+    elif args.command == 'rank':
+        count = rank(args.jd, args.index, args.out, top_k=args.top)
+        print(f"✅ Ranking complete! Wrote {count} candidates to {args.out}")
+    elif args.command == 'rescore':
+        count = rescore_checkpoint(args.checkpoint, args.out, dict(zip(DEFAULT_WEIGHTS, args.weights)), args.thresholds,
+                                   args.collapse_duplicates)
+        print(f"✅ Rescoring complete! Wrote {count} candidates to {args.out}")
+    elif args.command == 'submit':
+        job_hash, added = JobQueue(args.queue).submit(read_job_description(args.jd), find_resumes(args.resumes))
+        print(f"✅ Queued {added} resumes (job {job_hash[:12]}) in {args.queue}")
+    elif args.command == 'worker':
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(message)s')
+        # The machine's cores are shared between the worker processes' extraction pools
+        extraction_workers = args.extraction_workers or max(1, (os.cpu_count() or 1) // args.processes)
+        worker_args = (args.queue, args.chunk_size, args.batch_size, extraction_workers, args.timeout)
+        worker_kwargs = {"exit_when_empty": args.exit_when_empty}
+        if args.processes <= 1:
+            finished = run_worker(*worker_args, **worker_kwargs)
+            print(f"✅ Worker finished {finished} jobs")
+        else:
+            # Load the model once here so forked workers inherit it instead of each loading their
+            # own; each worker's torch threads are pinned to its share of the cores
+            worker_kwargs["torch_threads"] = max(1, (os.cpu_count() or 1) // args.processes)
+            if multiprocessing.get_start_method() == 'fork':
+                prepare_fork()
+                warm_up()
+            processes = [multiprocessing.Process(target=run_worker, args=worker_args, kwargs=worker_kwargs)
+                         for _ in range(args.processes)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+    elif args.command == 'status':
+        queue = JobQueue(args.queue)
+        if args.retry_failed:
+            print(f"🔁 Re-queued {queue.retry_failed()} failed jobs")
+        status = queue.status()
+        eta = f"{status['eta_minutes']:.1f} min" if status['eta_minutes'] is not None else "n/a"
+        print(f"queued {status['queued']} | running {status['running']} | done {status['done']} | "
+              f"failed {status['failed']}")
+        print(f"{len(status['workers'])} active worker(s) | {status['per_minute']:.1f} resumes/min "
+              f"(last 10 min) | ETA {eta}")
+        for worker in status['workers']:
+            print(f"  {worker}")
+    elif args.command == 'collect':
+        job_hash = hash_text(read_job_description(args.jd))
+        count = write_results(JobQueue(args.queue).records(job_hash), args.out)
+        print(f"✅ Wrote {count} candidates to {args.out}")
+    elif args.command == 'serve':
+        from service import serve
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(levelname)s %(message)s')
+        serve(args.host, args.port, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
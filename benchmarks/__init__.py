@@ -0,0 +1 @@
+"""Benchmarks and the synthetic corpus they run on; run each module with python -m from the repository root"""
@@ -0,0 +1,43 @@
+"""Benchmark: per-resume semantic scoring vs analyze_batch at several batch sizes
+
+Run from the repository root:
+    python -m benchmarks.bench_batch_embedding --resumes 256 --batch-sizes 1 8 32 64
+"""
+import argparse
+import time
+
+from benchmarks.corpus import make_text
+from resume_analyzer import analyze_batch, prepare_job, resume_analyzer_app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=256)
+    parser.add_argument('--words', type=int, default=400)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    job_description = make_text(150, skill_ratio=0.2, seed=-1)
+    resumes = [make_text(args.words, seed=i) for i in range(args.resumes)]
+    job = prepare_job(job_description)
+
+    start = time.perf_counter()
+    single = [
+        resume_analyzer_app.invoke({
+            "resume_text": resume_text,
+            "job_description": job_description,
+            "prepared_job": job
+        })
+        for resume_text in resumes
+    ]
+    elapsed = time.perf_counter() - start
+    print(f"per-resume      | {len(resumes) / elapsed:8.1f} resumes/s")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        batch = analyze_batch(resumes, job, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        drift = max(abs(a["semantic_similarity"] - b["semantic_similarity"]) for a, b in zip(single, batch))
+        print(f"batch_size={batch_size:<4} | {len(resumes) / elapsed:8.1f} resumes/s | max similarity drift {drift:.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Benchmark: throughput of truncated vs chunked resume embedding
+
+Run from the repository root:
+    python -m benchmarks.bench_chunked_embedding --resumes 64 --words 1500
+"""
+import argparse
+import time
+
+import step3e_semantic_node
+from benchmarks.corpus import make_text
+from step3e_semantic_node import batch_semantic_similarity, encode_job_text
+from step3c_utils import clean_text_for_similarity
+
+def run(resumes, job_embedding, batch_size):
+    start = time.perf_counter()
+    batch_semantic_similarity(resumes, job_embedding, batch_size=batch_size)
+    return len(resumes) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=64)
+    parser.add_argument('--words', type=int, default=1500)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--max-chunks', type=int, nargs='+', default=[2, 4, 8])
+    args = parser.parse_args()
+
+    resumes = [make_text(args.words, seed=i) for i in range(args.resumes)]
+    job_embedding = encode_job_text(clean_text_for_similarity(make_text(150, skill_ratio=0.2, seed=-1)))
+
+    step3e_semantic_node.EMBEDDING_MODE = "truncate"
+    baseline = run(resumes, job_embedding, args.batch_size)
+    print(f"truncate          | {baseline:8.1f} resumes/s")
+
+    step3e_semantic_node.EMBEDDING_MODE = "chunked"
+    for max_chunks in args.max_chunks:
+        step3e_semantic_node.MAX_CHUNKS = max_chunks
+        throughput = run(resumes, job_embedding, args.batch_size)
+        print(f"chunked, max {max_chunks:<4} | {throughput:8.1f} resumes/s | {baseline / throughput:4.1f}x slower")
+
+if __name__ == "__main__":
+    main()
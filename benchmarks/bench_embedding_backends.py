@@ -0,0 +1,82 @@
+"""Parity check and throughput benchmark for the embedding backends
+
+Scores the same resumes against one JD with every backend, compares each backend's
+cosine scores with the first (reference) backend, and times single-resume encodes (as
+in semantic_analysis_node) and batched encodes. Exits non-zero when a backend's scores
+drift from the reference by more than --tolerance, so it doubles as the parity test.
+Backends whose packages are not installed are skipped. Run from the repository root:
+    python -m benchmarks.bench_embedding_backends --resumes 200 --tolerance 0.03
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_resume, generate_job_description
+from step3b_models import EMBEDDING_BACKENDS, get_semantic_model
+from step3c_utils import clean_text_for_similarity
+
+def cosine_scores(model, job_text, resume_texts, batch_size):
+    job = model.encode(job_text)
+    resumes = model.encode(resume_texts, batch_size=batch_size)
+    return (resumes @ job) / (np.linalg.norm(resumes, axis=1) * np.linalg.norm(job))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', nargs='+', default=list(EMBEDDING_BACKENDS), choices=list(EMBEDDING_BACKENDS),
+                        help='Backends to compare; the first is the parity reference')
+    parser.add_argument('--resumes', type=int, default=200)
+    parser.add_argument('--single', type=int, default=50, help='Resumes to encode one at a time')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--tolerance', type=float, default=0.03, help='Largest allowed cosine score difference')
+    args = parser.parse_args()
+
+    resume_texts = [clean_text_for_similarity(generate_resume(i)) for i in range(args.resumes)]
+    job_text = clean_text_for_similarity(generate_job_description())
+
+    reference = None
+    failures = 0
+    for backend in args.backends:
+        try:
+            start = time.perf_counter()
+            model = get_semantic_model(backend)
+            load_time = time.perf_counter() - start
+        except ImportError as e:
+            print(f"{backend:<22} | skipped ({e})")
+            continue
+        model.encode(resume_texts[:2])  # warm-up
+
+        start = time.perf_counter()
+        for text in resume_texts[:args.single]:
+            model.encode(text)
+        single_ms = (time.perf_counter() - start) / min(args.single, len(resume_texts)) * 1000
+
+        start = time.perf_counter()
+        scores = cosine_scores(model, job_text, resume_texts, args.batch_size)
+        batch_rate = len(resume_texts) / (time.perf_counter() - start)
+
+        line = (f"{backend:<22} | load {load_time:6.2f} s | single {single_ms:8.2f} ms/resume | "
+                f"batch {batch_rate:8.1f} resumes/s")
+        if reference is None:
+            reference = (backend, scores, single_ms, batch_rate)
+            line += " | reference"
+        else:
+            _, reference_scores, reference_single, reference_rate = reference
+            drift = np.abs(scores - reference_scores)
+            top = min(10, len(scores))
+            overlap = len(set(np.argsort(-scores)[:top]) & set(np.argsort(-reference_scores)[:top]))
+            ok = drift.max() <= args.tolerance
+            failures += not ok
+            line += (f" | {reference_single / single_ms:5.2f}x single, {batch_rate / reference_rate:5.2f}x batch"
+                     f" | max |Δcos| {drift.max():.4f}, mean {drift.mean():.4f}, top-{top} overlap {overlap}/{top}"
+                     f" | {'ok' if ok else 'DRIFT'}")
+        print(line)
+
+    if failures:
+        print(f"❌ {failures} backend(s) drifted more than {args.tolerance} from {reference[0]}")
+        sys.exit(1)
+    print("✅ Parity check passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Fuzz/benchmark harness: extract_years_of_experience on adversarial 100KB texts
+
+Every adversarial document must finish under --ceiling seconds; the script exits
+non-zero otherwise. --legacy also times the original unbounded patterns on smaller
+inputs (they can take seconds or more, which is the point). Run from the repository root:
+    python -m benchmarks.bench_experience_extraction --size 100000 --ceiling 0.5 --legacy
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from step3c_utils import extract_years_of_experience
+
+LEGACY_PATTERNS = [
+    r'(\d+)\s*\+?\s*years?[\s\w]*experience',
+    r'experience[\s\w]*of[\s\w]*(\d+)\s*\+?\s*years?',
+    r'(\d+)\s*-\s*(\d+)\s*years?[\s\w]*experience',
+    r'(\d+)\s*\+?\s*years?',
+]
+
+def legacy_extract(text):
+    """The original pattern loop, without its (separate) year-span fallback"""
+    text_lower = text.lower()
+    for pattern in LEGACY_PATTERNS:
+        if re.findall(pattern, text_lower):
+            break
+
+def adversarial_texts(size, seed=0):
+    """Texts built to make unbounded [\\s\\w]* runs backtrack, plus random noise"""
+    rng = random.Random(seed)
+    words = ['years', 'year', 'experience', 'of', '5', '2019', 'jan', '-', 'present', 'team', 'lead']
+    return {
+        "years without experience": ("5 years " + "word " * 50) * (size // 260 + 1),
+        "years then one long run": "5 years " + "a " * (size // 2),
+        "experience of, no years": ("experience of " + "x " * 40) * (size // 94 + 1),
+        "long digit runs": ("1" * 500 + " ") * (size // 501 + 1),
+        "ranges without years": "3 - 4 " * (size // 6 + 1),
+        "date-like noise": ("jan 2019 - " * 10 + "word ") * (size // 115 + 1),
+        "random tokens": ' '.join(rng.choice(words) for _ in range(size // 5)),
+    }
+
+def time_call(func, text):
+    start = time.perf_counter()
+    func(text)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100_000, help='Characters per adversarial text')
+    parser.add_argument('--ceiling', type=float, default=0.5, help='Maximum seconds allowed per text')
+    parser.add_argument('--legacy', action='store_true', help='Also time the original patterns')
+    parser.add_argument('--legacy-size', type=int, default=10_000, help='Characters per text for --legacy')
+    args = parser.parse_args()
+
+    failures = 0
+    for name, text in adversarial_texts(args.size).items():
+        elapsed = time_call(extract_years_of_experience, text[:args.size])
+        status = "ok" if elapsed <= args.ceiling else "TOO SLOW"
+        failures += status != "ok"
+        line = f"{name:<26} | {elapsed * 1000:9.2f} ms | {status}"
+        if args.legacy:
+            legacy_text = text[:args.legacy_size]
+            line += (f" | at {args.legacy_size} chars: new {time_call(extract_years_of_experience, legacy_text) * 1000:8.2f} ms,"
+                     f" legacy {time_call(legacy_extract, legacy_text) * 1000:9.2f} ms")
+        print(line)
+
+    if failures:
+        print(f"❌ {failures} text(s) exceeded the {args.ceiling}s ceiling")
+        sys.exit(1)
+    print(f"✅ All texts under the {args.ceiling}s ceiling")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Throughput benchmark for the PDF extraction backends and page budgets
+
+Extracts the same synthetic PDFs with every backend, once with the default MAX_PAGES /
+MAX_TEXT_CHARS budgets and once with no budget, and reports files/s, pages/s and how
+many words each backend recovered compared with the source text. The corpus mixes
+ordinary resumes with a few long "portfolio" PDFs, which is where the budgets pay off.
+Backends whose packages are not installed are skipped. Run from the repository root:
+    python -m benchmarks.bench_extraction_backends --resumes 100 --portfolios 5 --portfolio-pages 150
+"""
+import argparse
+import time
+
+from benchmarks.corpus import generate_resume, to_pdf
+from step3c_utils import PDF_BACKENDS, MAX_PAGES, MAX_TEXT_CHARS, extract_text_from_file
+
+NO_LIMIT = 10 ** 9
+
+def word_recall(source, extracted):
+    """Share of the source's distinct words that appear in the extracted text"""
+    source_words = set(source.split())
+    return len(source_words & set(extracted.split())) / len(source_words) if source_words else 1.0
+
+def run(backend, files, max_pages, max_chars):
+    start = time.perf_counter()
+    texts = [extract_text_from_file(content, "resume.pdf", max_chars=max_chars, max_pages=max_pages, pdf_backend=backend)
+             for content, _, _ in files]
+    return time.perf_counter() - start, texts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backends', nargs='+', default=list(PDF_BACKENDS), choices=list(PDF_BACKENDS))
+    parser.add_argument('--resumes', type=int, default=100, help='Ordinary 1-2 page resumes')
+    parser.add_argument('--portfolios', type=int, default=5, help='Long PDFs among them')
+    parser.add_argument('--portfolio-pages', type=int, default=150)
+    args = parser.parse_args()
+
+    files = []
+    for i in range(args.resumes):
+        words = args.portfolio_pages * 400 if i < args.portfolios else 600
+        source = generate_resume(i, words)
+        content = to_pdf(source)
+        files.append((content, source, content.count(b'/Type /Page ')))
+    total_pages = sum(pages for _, _, pages in files)
+    print(f"{len(files)} PDFs, {total_pages} pages, {sum(len(c) for c, _, _ in files) / 1024 / 1024:.1f} MB "
+          f"(budget: {MAX_PAGES} pages, {MAX_TEXT_CHARS} chars)")
+
+    reference = None
+    for backend in args.backends:
+        try:
+            extract_text_from_file(files[-1][0], "resume.pdf", pdf_backend=backend)  # warm-up
+        except ImportError as e:
+            print(f"{backend:<10} | skipped ({e})")
+            continue
+        full_time, full_texts = run(backend, files, NO_LIMIT, NO_LIMIT)
+        budget_time, budget_texts = run(backend, files, MAX_PAGES, MAX_TEXT_CHARS)
+        recall = sum(word_recall(source, text) for (_, source, _), text in zip(files, full_texts)) / len(files)
+        reference = reference or (backend, full_time)
+
+        print(f"{backend:<10} | full {len(files) / full_time:7.1f} files/s, {total_pages / full_time:8.1f} pages/s"
+              f" | budgeted {len(files) / budget_time:7.1f} files/s ({full_time / budget_time:5.2f}x)"
+              f" | {reference[1] / full_time:5.2f}x vs {reference[0]} | word recall {recall:.3f}"
+              f" | budgeted chars {sum(map(len, budget_texts)) / len(files):,.0f}/file")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: per-resume latency of the linear graph vs parallel keyword/semantic branches
+
+Run from the repository root:
+    python -m benchmarks.bench_graph_latency --resumes 50 --words 800
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.corpus import make_text
+from resume_analyzer import resume_analyzer_app, prepare_job
+from step3a_imports import AnalysisState, StateGraph, END
+from step3d_keyword_node import keyword_extraction_node
+from step3e_semantic_node import semantic_analysis_node
+from step3f_scoring_node import calculate_match_score_node
+from step3g_suggestion_node import generate_suggestions_node
+
+def build_linear_app():
+    """The original strictly sequential wiring, for comparison"""
+    workflow = StateGraph(AnalysisState)
+    workflow.add_node("keyword_extraction", keyword_extraction_node)
+    workflow.add_node("semantic_analysis", semantic_analysis_node)
+    workflow.add_node("score_calculation", calculate_match_score_node)
+    workflow.add_node("suggestion_generation", generate_suggestions_node)
+    workflow.set_entry_point("keyword_extraction")
+    workflow.add_edge("keyword_extraction", "semantic_analysis")
+    workflow.add_edge("semantic_analysis", "score_calculation")
+    workflow.add_edge("score_calculation", "suggestion_generation")
+    workflow.add_edge("suggestion_generation", END)
+    return workflow.compile()
+
+def sync_latencies(app, states):
+    latencies = []
+    for state in states:
+        start = time.perf_counter()
+        app.invoke(state)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+async def async_latencies(app, states):
+    latencies = []
+    for state in states:
+        start = time.perf_counter()
+        await app.ainvoke(state)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{label:<20} | p50 {statistics.median(latencies) * 1000:8.2f} ms | p95 {p95 * 1000:8.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=50)
+    parser.add_argument('--words', type=int, default=800)
+    args = parser.parse_args()
+
+    job_description = make_text(150, skill_ratio=0.2, seed=-1)
+    job = prepare_job(job_description)
+    states = [
+        {"resume_text": make_text(args.words, seed=i), "job_description": job_description, "prepared_job": job}
+        for i in range(args.resumes)
+    ]
+
+    linear_app = build_linear_app()
+    # Warm both graphs (and the model) before timing
+    linear_app.invoke(states[0])
+    resume_analyzer_app.invoke(states[0])
+
+    report("linear invoke", sync_latencies(linear_app, states))
+    report("parallel invoke", sync_latencies(resume_analyzer_app, states))
+    report("linear ainvoke", asyncio.run(async_latencies(linear_app, states)))
+    report("parallel ainvoke", asyncio.run(async_latencies(resume_analyzer_app, states)))
+
+    for label, app in (("linear abatch", linear_app), ("parallel abatch", resume_analyzer_app)):
+        start = time.perf_counter()
+        asyncio.run(app.abatch(states))
+        print(f"{label:<20} | {len(states) / (time.perf_counter() - start):8.1f} resumes/s")
+
+if __name__ == "__main__":
+    main()
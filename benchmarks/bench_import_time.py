@@ -0,0 +1,42 @@
+"""Benchmark: cost of importing resume_analyzer vs loading its models
+
+Each measurement runs in a fresh interpreter with `python -X importtime`, so
+nothing is shared between runs. Run from the repository root:
+    python -m benchmarks.bench_import_time --repeat 3
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "import step3c_utils": "import step3c_utils",
+    "import resume_analyzer": "import resume_analyzer",
+    "import + load semantic model": "import resume_analyzer; resume_analyzer.get_semantic_model()",
+}
+
+def measure(code):
+    """Wall time of a fresh interpreter running code, plus the -X importtime cumulative total"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    # Top-level imports have no leading indentation after the pipe; sum their cumulative times
+    top_level = re.findall(r'^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s\S', proc.stderr, re.MULTILINE)
+    return elapsed, sum(int(us) for us in top_level) / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for label, code in SCENARIOS.items():
+        runs = [measure(code) for _ in range(args.repeat)]
+        wall = min(run[0] for run in runs)
+        imports = min(run[1] for run in runs)
+        print(f"{label:<30} | wall {wall:6.2f} s | imports {imports:6.2f} s")
+
+if __name__ == "__main__":
+    main()
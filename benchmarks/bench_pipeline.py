@@ -0,0 +1,123 @@
+"""Benchmark: per-stage and end-to-end latency of the analysis pipeline
+
+Times extract_text_from_file for each file format, every graph node on its own, and
+the full resume_analyzer_app.invoke over a synthetic corpus. Reports p50/p95 latency
+and resumes/second, and writes the results as JSON so runs can be compared over time.
+Run from the repository root:
+    python -m benchmarks.bench_pipeline --resumes 100 --out benchmarks/results/run.json
+    python -m benchmarks.bench_pipeline --resumes 100 --compare benchmarks/results/run.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+from benchmarks.corpus import generate_resume, generate_job_description, to_format
+from resume_analyzer import resume_analyzer_app, prepare_job
+from step3c_utils import extract_text_from_file
+from step3d_keyword_node import keyword_extraction_node
+from step3e_semantic_node import semantic_analysis_node
+from step3f_scoring_node import calculate_match_score_node
+from step3g_suggestion_node import generate_suggestions_node
+
+def summarize(latencies):
+    """p50 / p95 / mean in milliseconds and items per second"""
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "per_second": len(ordered) / sum(ordered) if sum(ordered) else float('inf'),
+    }
+
+def timed(func, inputs):
+    """Latency of func for each input, plus the outputs"""
+    latencies, outputs = [], []
+    for item in inputs:
+        start = time.perf_counter()
+        outputs.append(func(item))
+        latencies.append(time.perf_counter() - start)
+    return latencies, outputs
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def run(resumes, words, formats):
+    texts = [generate_resume(i, words) for i in range(resumes)]
+    job_description = generate_job_description()
+    job = prepare_job(job_description)
+    stages = {}
+
+    for fmt in formats:
+        files = [(to_format(text, fmt), f"resume.{fmt}") for text in texts]
+        latencies, _ = timed(lambda file: extract_text_from_file(*file), files)
+        stages[f"extract_{fmt}"] = summarize(latencies)
+
+    states = [{"resume_text": text, "job_description": job_description, "prepared_job": job} for text in texts]
+    # Warm the model so its load time does not land in the first sample
+    semantic_analysis_node(states[0])
+
+    latencies, keyword_outputs = timed(keyword_extraction_node, states)
+    stages["keyword_extraction"] = summarize(latencies)
+    latencies, semantic_outputs = timed(semantic_analysis_node, states)
+    stages["semantic_analysis"] = summarize(latencies)
+
+    scored_states = [{**state, **keywords, **semantic}
+                     for state, keywords, semantic in zip(states, keyword_outputs, semantic_outputs)]
+    latencies, _ = timed(calculate_match_score_node, scored_states)
+    stages["score_calculation"] = summarize(latencies)
+    latencies, _ = timed(generate_suggestions_node, scored_states)
+    stages["suggestion_generation"] = summarize(latencies)
+
+    latencies, _ = timed(resume_analyzer_app.invoke, states)
+    stages["full_invoke"] = summarize(latencies)
+    return stages
+
+def print_report(stages, baseline=None):
+    for name, stats in stages.items():
+        line = (f"{name:<22} | p50 {stats['p50_ms']:9.3f} ms | p95 {stats['p95_ms']:9.3f} ms | "
+                f"{stats['per_second']:9.1f} /s")
+        if baseline and name in baseline:
+            change = (stats['p50_ms'] - baseline[name]['p50_ms']) / baseline[name]['p50_ms'] * 100
+            line += f" | p50 {change:+6.1f}% vs baseline"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=100)
+    parser.add_argument('--words', type=int, default=600)
+    parser.add_argument('--formats', nargs='+', default=['txt', 'docx', 'pdf'], choices=['txt', 'docx', 'pdf'])
+    parser.add_argument('--out', help='Write results JSON here')
+    parser.add_argument('--compare', help='Results JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    stages = run(args.resumes, args.words, args.formats)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)["stages"]
+    print_report(stages, baseline)
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({
+                "timestamp": datetime.now().isoformat(timespec='seconds'),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "params": {"resumes": args.resumes, "words": args.words, "formats": args.formats},
+                "stages": stages,
+            }, f, indent=2)
+        print(f"✅ Results written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Microbenchmark: per-skill regex loop vs the precompiled skill matcher
+
+Run from the repository root:
+    python -m benchmarks.bench_skill_matching --repeat 200
+"""
+import argparse
+import re
+import time
+
+from benchmarks.corpus import make_text
+from step3d_keyword_node import ALL_SKILLS, find_skills
+
+def legacy_find_skills(text):
+    """The original keyword_extraction_node loop: one regex search per skill"""
+    return [skill for skill in ALL_SKILLS if re.search(r'\b' + re.escape(skill) + r'\b', text)]
+
+def time_it(func, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    for words in (200, 800, 3000):
+        text = make_text(words)
+        legacy = time_it(legacy_find_skills, text, args.repeat)
+        matcher = time_it(find_skills, text, args.repeat)
+        print(f"{words:>5} words | legacy {legacy * 1000:8.3f} ms | matcher {matcher * 1000:8.3f} ms | "
+              f"speedup {legacy / matcher:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Memory and throughput: single process vs spawned vs pre-forked worker pools
+
+Screens the same synthetic corpus (written to a temporary directory as TXT, DOCX and
+PDF) three ways: extraction and analyze_batch in this process; a PipelinePool whose
+spawned workers each import the pipeline and load the model; and a PipelinePool forked
+after the model was loaded here. For each it reports pool start-up time (until every
+worker has answered), throughput, and the memory of the whole process tree as RSS and
+PSS (proportional set size: shared pages are split between the processes sharing them,
+so copy-on-write sharing shows up as a lower total). Linux only, since it reads
+/proc/<pid>/smaps_rollup. Run from the repository root:
+    python -m benchmarks.bench_worker_pool --resumes 400 --processes 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.corpus import write_corpus, generate_job_description
+
+def memory_mb(pids):
+    """Total (RSS, PSS) in MB over the given processes"""
+    rss = pss = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, value = line.split(':', 1)
+                if name == 'Rss':
+                    rss += int(value.split()[0])
+                elif name == 'Pss':
+                    pss += int(value.split()[0])
+    return rss / 1024, pss / 1024
+
+def tree_memory():
+    return memory_mb([os.getpid()] + [child.pid for child in multiprocessing.active_children()])
+
+def _ready(_):
+    time.sleep(0.2)  # hold the worker so every worker gets one task
+    return os.getpid()
+
+def run_single(files, job, batch_size):
+    from resume_analyzer import analyze_batch
+    from step3c_utils import extract_text_from_file
+    start = time.perf_counter()
+    texts = []
+    for path, filename in files:
+        with open(path, 'rb') as f:
+            text = extract_text_from_file(f.read(), filename)
+        if text and len(text.strip()) >= 50:
+            texts.append(text)
+    analyze_batch(texts, job, batch_size=batch_size)
+    return 0.0, time.perf_counter() - start, tree_memory()
+
+def run_pool(files, job, batch_size, processes, start_method):
+    from worker_pool import PipelinePool
+    start = time.perf_counter()
+    pool = PipelinePool(processes, start_method=start_method)
+    list(pool._executor.map(_ready, range(processes)))
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    errors = sum(outcome["error"] is not None for outcome in pool.analyze_files(files, job, batch_size=batch_size))
+    elapsed = time.perf_counter() - start
+    memory = tree_memory()
+    pool.close()
+    if errors:
+        print(f"  ({errors} files failed)")
+    return startup, elapsed, memory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resumes', type=int, default=400)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--modes', nargs='+', default=['single', 'spawn', 'fork'], choices=['single', 'spawn', 'fork'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(directory, args.resumes, ('txt', 'docx', 'pdf'))
+        files = [(path, os.path.basename(path)) for path in paths]
+
+        # The spawn pool runs first, before this process has loaded the model, so its
+        # workers' start-up cost is measured on its own
+        order = [mode for mode in ('spawn', 'single', 'fork') if mode in args.modes]
+        job = None
+        for mode in order:
+            if mode != 'spawn' and job is None:
+                from resume_analyzer import prepare_job
+                job = prepare_job(generate_job_description())
+            if mode == 'single':
+                startup, elapsed, (rss, pss) = run_single(files, job, args.batch_size)
+                workers = 1
+            else:
+                # Before the model is loaded here, workers get the JD text and prepare it themselves
+                job_arg = job if job is not None else generate_job_description()
+                startup, elapsed, (rss, pss) = run_pool(files, job_arg, args.batch_size, args.processes, mode)
+                workers = args.processes
+            print(f"{mode:<6} | {workers:2d} process(es) | start-up {startup:6.2f} s | "
+                  f"{len(files) / elapsed:8.1f} resumes/s | RSS {rss:8.1f} MB | PSS {pss:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Synthetic resume and job description generator for the benchmarks
+
+Resumes are built from the real skill vocabularies in step3d_keyword_node, with the
+sections, date ranges and headings the extractors look for, and can be written as
+TXT, DOCX or PDF. Run from the repository root to write a corpus to disk:
+    python -m benchmarks.corpus --out ./bench_corpus --resumes 200 --formats txt docx pdf
+"""
+import argparse
+import io
+import os
+import random
+
+from step3d_keyword_node import ALL_SKILLS, TECHNICAL_SKILLS, HR_SKILLS, BUSINESS_SKILLS, SOFT_SKILLS
+
+FILLER_WORDS = [
+    'responsible', 'for', 'the', 'design', 'and', 'delivery', 'of', 'team', 'projects',
+    'worked', 'with', 'stakeholders', 'across', 'multiple', 'regions', 'to', 'improve', 'results'
+]
+FIRST_NAMES = ['Ayesha', 'Bilal', 'Fatima', 'Hamza', 'Sana', 'Usman', 'Zainab', 'Omar', 'Hira', 'Ali']
+LAST_NAMES = ['Khan', 'Ahmed', 'Malik', 'Qureshi', 'Siddiqui', 'Raza', 'Sheikh', 'Butt', 'Iqbal', 'Hussain']
+TITLES = ['Software Engineer', 'Data Analyst', 'HR Manager', 'Project Manager', 'Marketing Specialist',
+          'Finance Officer', 'Operations Lead', 'Business Analyst', 'Talent Acquisition Specialist']
+COMPANIES = ['Acme Technologies Ltd', 'Indus Solutions', 'Crescent Group', 'Ravi Systems Inc',
+             'Margalla International', 'Karakoram Global', 'Sapphire Retail Company']
+DEGREES = ['Bachelor of Science in Computer Science', 'Master of Business Administration (MBA)',
+           'BS Human Resource Management', 'MSc Economics', 'Bachelor of Commerce']
+UNIVERSITIES = ['University of the Punjab', 'Lahore University of Management Sciences',
+                'National University of Sciences and Technology', 'Institute of Business Administration']
+SKILL_POOLS = [TECHNICAL_SKILLS, HR_SKILLS, BUSINESS_SKILLS]
+
+def make_text(words, skill_ratio=0.1, seed=0):
+    """Lowercased unstructured text with a sprinkle of known skills"""
+    rng = random.Random(seed)
+    tokens = [rng.choice(ALL_SKILLS) if rng.random() < skill_ratio else rng.choice(FILLER_WORDS)
+              for _ in range(words)]
+    return ' '.join(tokens).lower()
+
+def _sentence(rng, skills, words=18):
+    tokens = [rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER_WORDS) for _ in range(words)]
+    return ' '.join(tokens).capitalize() + '.'
+
+def generate_resume(seed=0, words=600):
+    """A structured resume of roughly the given length, as plain text"""
+    rng = random.Random(seed)
+    pool = rng.choice(SKILL_POOLS)
+    skills = rng.sample(pool, min(len(pool), rng.randint(8, 20))) + rng.sample(SOFT_SKILLS, 4)
+    years = rng.randint(1, 15)
+    end_year = 2025
+
+    lines = [
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        rng.choice(TITLES),
+        f"Email: candidate{seed}@example.com | Phone: +92 300 {seed:07d}",
+        "SUMMARY",
+        f"Professional with {years}+ years of experience. " + _sentence(rng, skills),
+        "WORK EXPERIENCE",
+    ]
+    year = end_year
+    while len(' '.join(lines).split()) < words - 60:
+        start = year - rng.randint(1, 4)
+        lines += [
+            rng.choice(TITLES),
+            rng.choice(COMPANIES),
+            f"Jan {start} - {'Present' if year == end_year else f'Dec {year}'}",
+        ] + [f"• {_sentence(rng, skills)}" for _ in range(rng.randint(2, 5))]
+        year = start - 1
+    lines += [
+        "EDUCATION",
+        rng.choice(DEGREES),
+        rng.choice(UNIVERSITIES),
+        "SKILLS",
+        ', '.join(skills),
+    ]
+    return '\n'.join(lines)
+
+def generate_job_description(seed=0):
+    """A job description asking for a handful of skills and some years of experience"""
+    rng = random.Random(-1 - seed)
+    pool = rng.choice(SKILL_POOLS)
+    skills = rng.sample(pool, min(len(pool), 10)) + rng.sample(SOFT_SKILLS, 3)
+    return '\n'.join([
+        f"Job Title: {rng.choice(TITLES)}",
+        f"We are looking for a candidate with {rng.randint(2, 8)}+ years of experience.",
+        "Requirements:",
+    ] + [f"- {skill}" for skill in skills] + [_sentence(rng, skills, 40)])
+
+def to_docx(text):
+    from docx import Document
+    document = Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def to_pdf(text, lines_per_page=50):
+    """A minimal multi-page PDF with one Helvetica text line per resume line"""
+    def escape(line):
+        line = line.encode('latin-1', 'replace').decode('latin-1')
+        return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    lines = text.split('\n')
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 50 800 Td 14 TL " + ' '.join(f"({escape(line)}) '" for line in page) + " ET"
+        stream = stream.encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b' '.join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+def to_format(text, fmt):
+    """Encode text as file bytes for 'txt', 'docx' or 'pdf'"""
+    if fmt == 'pdf':
+        return to_pdf(text)
+    if fmt == 'docx':
+        return to_docx(text)
+    return text.encode('utf-8')
+
+def write_corpus(directory, resumes=100, formats=('txt',), words=600, seed=0):
+    """Write synthetic resumes (cycling through formats) and a jd.txt; returns the file paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(resumes):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(directory, f"resume_{i:05d}.{fmt}")
+        with open(path, 'wb') as f:
+            f.write(to_format(generate_resume(seed + i, words), fmt))
+        paths.append(path)
+    with open(os.path.join(directory, "jd.txt"), 'w', encoding='utf-8') as f:
+        f.write(generate_job_description(seed))
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--resumes', type=int, default=100)
+    parser.add_argument('--words', type=int, default=600)
+    parser.add_argument('--formats', nargs='+', default=['txt'], choices=['txt', 'docx', 'pdf'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_corpus(args.out, args.resumes, args.formats, args.words, args.seed)
+    print(f"✅ Wrote {len(paths)} resumes and jd.txt to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import re
+import hashlib
+import numpy as np
+from result_cache import hash_text
+
+# MinHash with 128 permutations split into 32 LSH bands of 4 rows: pairs above ~0.6
+# Jaccard similarity almost always share a band, so candidates are then checked
+# against the threshold using the signatures
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_WORDS = 3
+# Estimated Jaccard similarity above which two resumes count as the same; 1 disables near-duplicates
+DEFAULT_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.7))
+
+_rng = np.random.RandomState(1)
+# Odd 64-bit multipliers for multiply-shift hashing of the 32-bit shingle hashes
+_PERM_A = _rng.randint(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.randint(0, np.iinfo(np.uint64).max, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+_WORD_RE = re.compile(r'\w+')
+
+def normalize_text(text):
+    """Lowercased words joined by single spaces, so layout and punctuation edits do not matter"""
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+def shingle_hashes(normalized_text, words=SHINGLE_WORDS):
+    """32-bit hashes of the overlapping word n-grams of normalized text"""
+    tokens = normalized_text.split()
+    grams = {' '.join(tokens[i:i + words]) for i in range(max(1, len(tokens) - words + 1))}
+    return np.array([int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=4).digest(), 'little')
+                     for gram in grams], dtype=np.uint64)
+
+def minhash_signature(hashes):
+    """NUM_PERM minimum values of ((a*x + b) mod 2**64) >> 32 over the shingle hashes"""
+    if len(hashes) == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint64)
+    # uint64 arithmetic wraps mod 2**64, which is what multiply-shift hashing relies on
+    with np.errstate(over='ignore'):
+        permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) >> _SHIFT
+    return permuted.min(axis=1)
+
+class DuplicateIndex:
+    """Incremental exact and near-duplicate detection over resumes
+
+    check(key, text, byte_hash) returns the key of an earlier resume that this one
+    duplicates, or registers it as a new original and returns None. Exact duplicates
+    are caught by byte hash and by the hash of the normalized text; near-duplicates
+    (re-submitted resumes with small edits) by MinHash LSH over word shingles, with
+    estimated Jaccard similarity of at least threshold. Only signatures are kept, so
+    memory stays around 1 KB per original.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._by_bytes = {}
+        self._by_text = {}
+        self._bands = [{} for _ in range(BANDS)]
+        self._signatures = {}
+
+    def check_bytes(self, byte_hash):
+        """The original registered for these exact bytes, or None; needs no text, so it can run before extraction"""
+        return self._by_bytes.get(byte_hash)
+
+    def check(self, key, text, byte_hash=None):
+        if byte_hash is not None and byte_hash in self._by_bytes:
+            return self._by_bytes[byte_hash]
+
+        normalized = normalize_text(text or '')
+        text_hash = hash_text(normalized)
+        original = self._by_text.get(text_hash)
+
+        signature = None
+        if original is None and self.threshold < 1 and normalized:
+            signature = minhash_signature(shingle_hashes(normalized))
+            original = self._near_duplicate(signature)
+
+        if original is not None:
+            if byte_hash is not None:
+                self._by_bytes[byte_hash] = original
+            return original
+
+        if byte_hash is not None:
+            self._by_bytes[byte_hash] = key
+        self._by_text[text_hash] = key
+        if signature is not None:
+            self._signatures[key] = signature
+            for band, bucket in zip(self._band_keys(signature), self._bands):
+                bucket.setdefault(band, []).append(key)
+        return None
+
+    def _band_keys(self, signature):
+        rows = NUM_PERM // BANDS
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(BANDS)]
+
+    def _near_duplicate(self, signature):
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for band, bucket in zip(self._band_keys(signature), self._bands):
+            for candidate in bucket.get(band, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+        return best
+
+def find_duplicates(documents, threshold=DEFAULT_THRESHOLD):
+    """Map each duplicate's key to its original's key for (key, text, byte_hash) documents, in order"""
+    index = DuplicateIndex(threshold)
+    duplicates = {}
+    for key, text, byte_hash in documents:
+        original = index.check(key, text, byte_hash)
+        if original is not None:
+            duplicates[key] = original
+    return duplicates
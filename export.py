@@ -0,0 +1,160 @@
+import io
+import os
+import csv
+import math
+import numbers
+import numpy as np
+
+# Row colours used by the report: strong matches green, the rest red
+STRONG_MATCH_FORMAT = {'bg_color': '#d4edda'}
+WEAK_MATCH_FORMAT = {'bg_color': '#f8d7da'}
+
+EXPORT_MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+def score_row_format(score_column, threshold=70):
+    """Row formatter colouring rows by a score column (numbers or strings like '85%')"""
+    def row_format(row):
+        score = float(str(row[score_column]).rstrip('%'))
+        return STRONG_MATCH_FORMAT if score >= threshold else WEAK_MATCH_FORMAT
+    return row_format
+
+def write_xlsx(rows, columns, file, sheet_name='Resume Analysis', row_format=None):
+    """Stream dict rows into an xlsx sheet in xlsxwriter's constant_memory mode
+
+    Each row is flushed to a temporary file once the next one starts, so memory stays
+    flat however many rows there are. row_format(row) may return format properties
+    (e.g. a background colour) for that row's cells. Returns the number of rows.
+    """
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(file, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True, 'border': 1})
+    formats = {}
+    widths = [len(column) + 2 for column in columns]
+
+    worksheet.write_row(0, 0, columns, header_format)
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        values = [row.get(column, '') for column in columns]
+        cell_format = None
+        if row_format is not None:
+            properties = row_format(row)
+            if properties:
+                key = tuple(sorted(properties.items()))
+                if key not in formats:
+                    formats[key] = workbook.add_format(properties)
+                cell_format = formats[key]
+        worksheet.write_row(count, 0, values, cell_format)
+        for i, value in enumerate(values):
+            widths[i] = max(widths[i], len(str(value)) + 2)
+
+    for i, width in enumerate(widths):
+        worksheet.set_column(i, i, min(width, 50))
+    workbook.close()
+    return count
+
+def write_csv(rows, columns, file):
+    """Stream dict rows into a binary file as UTF-8 CSV; returns the number of rows"""
+    text = io.TextIOWrapper(file, encoding='utf-8', newline='')
+    writer = csv.DictWriter(text, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+    text.flush()
+    # Hand the underlying file back to the caller open
+    text.detach()
+    return count
+
+def write_parquet(rows, columns, file, batch_rows=10_000, schema=None):
+    """Stream dict rows into a Parquet file, one row group per batch_rows rows (requires pyarrow)
+
+    Without an explicit pyarrow schema, column types come from the first batch, widened
+    so later batches always fit: numbers are stored as float64, and columns that are
+    empty or mixed in the first batch as strings. Values are cast to the column type.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append({column: row.get(column) for column in columns})
+        count += 1
+        if len(batch) >= batch_rows:
+            schema = schema or _parquet_schema(batch, columns)
+            writer = _write_parquet_batch(writer, batch, file, schema)
+            batch = []
+    if batch:
+        schema = schema or _parquet_schema(batch, columns)
+        writer = _write_parquet_batch(writer, batch, file, schema)
+    if writer is None:
+        writer = pq.ParquetWriter(file, schema or pa.schema([(column, pa.string()) for column in columns]))
+    writer.close()
+    return count
+
+def _parquet_schema(batch, columns):
+    import pyarrow as pa
+    fields = []
+    for column in columns:
+        values = [value for value in (row[column] for row in batch) if not _is_missing(value)]
+        if values and all(isinstance(value, (bool, np.bool_)) for value in values):
+            fields.append((column, pa.bool_()))
+        elif values and all(isinstance(value, numbers.Real) and not isinstance(value, bool) for value in values):
+            fields.append((column, pa.float64()))
+        else:
+            fields.append((column, pa.string()))
+    return pa.schema(fields)
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def _parquet_value(value, arrow_type):
+    import pyarrow as pa
+    if _is_missing(value):
+        return None
+    if pa.types.is_string(arrow_type):
+        return value if isinstance(value, str) else str(value)
+    if pa.types.is_floating(arrow_type):
+        return float(value)
+    if pa.types.is_boolean(arrow_type):
+        return bool(value)
+    return value
+
+def _write_parquet_batch(writer, batch, file, schema):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    arrays = [pa.array([_parquet_value(row[field.name], field.type) for row in batch], type=field.type)
+              for field in schema]
+    if writer is None:
+        writer = pq.ParquetWriter(file, schema)
+    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    return writer
+
+WRITERS = {'xlsx': write_xlsx, 'csv': write_csv, 'parquet': write_parquet}
+
+def write_export(rows, columns, file, fmt=None, row_format=None):
+    """Write rows to a path or binary file as xlsx, csv or parquet (from the extension by default)
+
+    Returns the number of rows written. row_format only applies to xlsx.
+    """
+    fmt = fmt or os.path.splitext(file)[1].lstrip('.').lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format {fmt!r}; expected one of {', '.join(WRITERS)}")
+    if isinstance(file, str):
+        with open(file, 'wb') as f:
+            return write_export(rows, columns, f, fmt, row_format)
+    if fmt == 'xlsx':
+        return write_xlsx(rows, columns, file, row_format=row_format)
+    return WRITERS[fmt](rows, columns, file)
+
+def export_bytes(rows, columns, fmt, row_format=None):
+    """The finished export file as bytes, e.g. for a download button"""
+    buffer = io.BytesIO()
+    write_export(rows, columns, buffer, fmt, row_format)
+    return buffer.getvalue()
@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing, contextmanager
+from result_cache import hash_text
+
+logger = logging.getLogger(__name__)
+
+# A claimed job whose worker has not sent a heartbeat for LEASE_SECONDS is assumed
+# crashed and handed to another worker, up to MAX_ATTEMPTS claims in total
+LEASE_SECONDS = int(os.environ.get("QUEUE_LEASE_SECONDS", 300))
+MAX_ATTEMPTS = int(os.environ.get("QUEUE_MAX_ATTEMPTS", 3))
+QUEUE_STATUSES = ('queued', 'running', 'done', 'failed')
+
+def worker_name():
+    """host:pid, unique across the machines sharing a queue"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class JobQueue:
+    """Durable screening queue in one SQLite file, shared by the workers using it
+
+    Each job is one resume file to score against one job description. Claims run in
+    an IMMEDIATE transaction, so two workers never get the same job as long as
+    SQLite's file locks work: always on one host's local disk. Across hosts that is
+    only as reliable as the shared filesystem's fcntl locking, which NFS and most
+    network filesystems do not guarantee; there a job can occasionally be claimed
+    twice (finish and release only touch the claiming worker's rows, so the results
+    stay consistent, but the work is duplicated). The default rollback journal is
+    kept rather than WAL because WAL needs shared memory, which network filesystems
+    do not provide at all. Paths are stored absolute, and every host must see them.
+    """
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS job_descriptions (
+                job_hash TEXT PRIMARY KEY, text TEXT, submitted_at REAL)""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY, job_hash TEXT, path TEXT, status TEXT, attempts INTEGER DEFAULT 0,
+                worker TEXT, submitted_at REAL, claimed_at REAL, heartbeat_at REAL, finished_at REAL,
+                result TEXT, error TEXT, UNIQUE (job_hash, path))""")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, job_hash, id)")
+
+    @contextmanager
+    def _transaction(self):
+        # isolation_level=None so BEGIN IMMEDIATE takes the write lock up front
+        with closing(sqlite3.connect(self.path, timeout=60, isolation_level=None)) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def submit(self, job_description, paths):
+        """Queue resume files against a job description; returns (job_hash, number newly queued)
+
+        Files already queued for the same job description are left as they are.
+        """
+        job_hash = hash_text(job_description)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO job_descriptions VALUES (?, ?, ?)", (job_hash, job_description, now))
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (job_hash, path, status, submitted_at) VALUES (?, ?, 'queued', ?)",
+                [(job_hash, os.path.abspath(path), now) for path in paths]
+            )
+            added = conn.total_changes - before
+        return job_hash, added
+
+    def claim(self, worker, limit=32):
+        """Atomically take up to limit queued jobs of one job description
+
+        Expired leases are recovered first: their jobs are queued again, or marked
+        failed once they have used up max_attempts. Returns (job_hash, job description,
+        [(job id, path)]), or None when nothing is queued.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+                "error = CASE WHEN attempts >= ? THEN 'worker lost ' || attempts || ' times' ELSE error END, "
+                "worker = NULL WHERE status = 'running' AND heartbeat_at < ?",
+                (self.max_attempts, self.max_attempts, now - self.lease_seconds)
+            )
+            row = conn.execute("SELECT job_hash FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            job_hash = row[0]
+            jobs = conn.execute(
+                "SELECT id, path FROM jobs WHERE status = 'queued' AND job_hash = ? ORDER BY id LIMIT ?",
+                (job_hash, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, claimed_at = ?, "
+                "heartbeat_at = ? WHERE id = ?",
+                [(worker, now, now, job_id) for job_id, _ in jobs]
+            )
+            job_description = conn.execute("SELECT text FROM job_descriptions WHERE job_hash = ?",
+                                           (job_hash,)).fetchone()[0]
+        return job_hash, job_description, jobs
+
+    def heartbeat(self, worker, job_ids):
+        """Extend the lease on jobs this worker is still processing"""
+        with self._transaction() as conn:
+            conn.executemany("UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                             [(time.time(), job_id, worker) for job_id in job_ids])
+
+    def finish(self, worker, outcomes):
+        """Record (job id, result, error) outcomes; jobs whose lease this worker lost are skipped"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                [('failed' if error else 'done', json.dumps(result) if result is not None else None, error, now,
+                  job_id, worker) for job_id, result, error in outcomes]
+            )
+
+    def release(self, worker, job_ids, error):
+        """Give claimed jobs back after an error: queued again, or failed after max_attempts"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, error = ?, "
+                "worker = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                [(self.max_attempts, error, job_id, worker) for job_id in job_ids]
+            )
+
+    def retry_failed(self, job_hash=None):
+        """Queue failed jobs again with a fresh attempt count; returns how many"""
+        query = "UPDATE jobs SET status = 'queued', attempts = 0, error = NULL, worker = NULL WHERE status = 'failed'"
+        with self._transaction() as conn:
+            cursor = conn.execute(query + (" AND job_hash = ?" if job_hash else ""), (job_hash,) if job_hash else ())
+            return cursor.rowcount
+
+    def records(self, job_hash=None):
+        """Finished jobs as checkpoint-style records ({"job_hash", "path", "result", "error"})"""
+        query = "SELECT job_hash, path, result, error FROM jobs WHERE status IN ('done', 'failed')"
+        with closing(sqlite3.connect(self.path, timeout=60)) as conn:
+            rows = conn.execute(query + (" AND job_hash = ?" if job_hash else "") + " ORDER BY id",
+                                (job_hash,) if job_hash else ()).fetchall()
+        return [{"job_hash": row[0], "path": row[1], "result": json.loads(row[2]) if row[2] else None, "error": row[3]}
+                for row in rows]
+
+    def status(self, window_seconds=600):
+        """Backlog and throughput: jobs per status, active workers, rate over the last window_seconds and ETA"""
+        now = time.time()
+        with closing(sqlite3.connect(self.path, timeout=60)) as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            # Rate over the time actually spent on the jobs finished recently, so a short run
+            # or an idle queue does not dilute it
+            recent, first_claimed, last_finished = conn.execute(
+                "SELECT COUNT(*), MIN(claimed_at), MAX(finished_at) FROM jobs "
+                "WHERE status IN ('done', 'failed') AND finished_at >= ?", (now - window_seconds,)).fetchone()
+            workers = [row[0] for row in conn.execute(
+                "SELECT DISTINCT worker FROM jobs WHERE status = 'running' AND heartbeat_at >= ?",
+                (now - self.lease_seconds,))]
+        status = {name: counts.get(name, 0) for name in QUEUE_STATUSES}
+        rate = recent / (last_finished - first_claimed) if recent and last_finished > first_claimed else 0.0
+        backlog = status['queued'] + status['running']
+        status.update({
+            "workers": workers,
+            "per_minute": rate * 60,
+            "eta_minutes": backlog / rate / 60 if rate else None,
+        })
+        return status
+
+def run_worker(queue_path, chunk_size=32, batch_size=32, extraction_workers=None, timeout=60,
+               poll_seconds=5, exit_when_empty=False, torch_threads=None):
+    """Claim and screen jobs until stopped (or, with exit_when_empty, until the queue is drained)
+
+    Text extraction fans out over one process pool of extraction_workers (CPU count by
+    default), kept for the worker's lifetime, and each claimed chunk is embedded in
+    batches; a heartbeat thread keeps the chunk's lease alive meanwhile. torch_threads
+    pins this worker's PyTorch thread pool, for several workers on one machine. Returns
+    the number of jobs finished.
+    """
+    from resume_analyzer import analyze_batch, prepare_job
+    from step3c_utils import extract_texts_parallel
+    from worker_pool import pin_torch_threads
+
+    if torch_threads:
+        pin_torch_threads(torch_threads)
+
+    queue = JobQueue(queue_path)
+    worker = worker_name()
+    prepared = {}
+    finished = 0
+    extraction_workers = extraction_workers or os.cpu_count() or 1
+    extraction_pool = ProcessPoolExecutor(max_workers=extraction_workers)
+
+    def extract(files):
+        nonlocal extraction_pool
+        try:
+            return list(extract_texts_parallel(files, timeout=timeout, executor=extraction_pool))
+        except BrokenProcessPool:
+            # A parser crash in an earlier chunk broke the pool (its files were retried in
+            # isolation then); replace it
+            extraction_pool.shutdown(wait=False)
+            extraction_pool = ProcessPoolExecutor(max_workers=extraction_workers)
+            return list(extract_texts_parallel(files, timeout=timeout, executor=extraction_pool))
+
+    try:
+        while True:
+            claimed = queue.claim(worker, chunk_size)
+            if claimed is None:
+                if exit_when_empty:
+                    return finished
+                time.sleep(poll_seconds)
+                continue
+            job_hash, job_description, jobs = claimed
+            if job_hash not in prepared:
+                prepared = {job_hash: prepare_job(job_description)}
+
+            stop = threading.Event()
+            def beat():
+                while not stop.wait(queue.lease_seconds / 3):
+                    try:
+                        queue.heartbeat(worker, [job_id for job_id, _ in jobs])
+                    except sqlite3.Error as e:
+                        logger.warning("Heartbeat failed: %s", e)
+            heartbeat = threading.Thread(target=beat, daemon=True)
+            heartbeat.start()
+            try:
+                outcomes, valid = [], []
+                for extraction in extract([(path, path) for _, path in jobs]):
+                    job_id, path = jobs[extraction["index"]]
+                    text = extraction["text"]
+                    if extraction["error"]:
+                        outcomes.append((job_id, None, extraction["error"]))
+                    elif not text or len(text.strip()) < 50:
+                        outcomes.append((job_id, None, "insufficient text content"))
+                    else:
+                        valid.append((job_id, text))
+                if valid:
+                    paths = dict(jobs)
+                    results = analyze_batch([text for _, text in valid], prepared[job_hash], batch_size=batch_size,
+                                            resume_ids=[paths[job_id] for job_id, _ in valid])
+                    for (job_id, _), result in zip(valid, results):
+                        for key in ("prepared_job", "job_description", "resume_text"):
+                            result.pop(key, None)
+                        outcomes.append((job_id, result, None))
+            except Exception as e:
+                # Hand the chunk back now rather than waiting for the lease to expire
+                logger.exception("%s failed a chunk of %d jobs", worker, len(jobs))
+                queue.release(worker, [job_id for job_id, _ in jobs], f"{type(e).__name__}: {e}")
+                continue
+            finally:
+                stop.set()
+                heartbeat.join()
+            queue.finish(worker, outcomes)
+            finished += len(outcomes)
+            logger.info("%s finished %d jobs (%d total)", worker, len(outcomes), finished)
+    finally:
+        extraction_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,229 @@
+import asyncio
+import contextvars
+import cProfile
+import functools
+import json
+import logging
+import os
+import pstats
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("resume_analyzer.profiling")
+
+# (profiler, resume label) for the code running in this context; graph nodes inherit it
+# because LangGraph copies the caller's context into its worker threads
+_active = contextvars.ContextVar("resume_profiler", default=None)
+
+def _resume_label(args, default):
+    if args and isinstance(args[0], dict):
+        return args[0].get("resume_id") or args[0].get("resume_filename") or default
+    return default
+
+def instrument(stage, func=None):
+    """Record each call of func as `stage` while a StageProfiler is tracking; usable as a decorator
+
+    With no profiler active the wrapper only does one context-variable lookup. The resume
+    label is the state's resume_id (or an analyzed result's resume_filename) when the
+    first argument carries one, so graph.batch runs stay per resume, otherwise the label
+    passed to StageProfiler.track. Coroutine functions are timed while awaited.
+    """
+    if func is None:
+        return lambda f: instrument(stage, f)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            active = _active.get()
+            if active is None:
+                return await func(*args, **kwargs)
+            profiler, resume = active
+            resume = _resume_label(args, resume)
+            # Wall time only means much here: other coroutines share the thread while this one waits
+            with profiler.measure(resume, stage):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        active = _active.get()
+        if active is None:
+            return func(*args, **kwargs)
+        profiler, resume = active
+        resume = _resume_label(args, resume)
+        with profiler.measure(resume, stage):
+            if profiler.profile_resume is not None and resume == profiler.profile_resume:
+                return profiler._profile_call(func, *args, **kwargs)
+            return func(*args, **kwargs)
+    return wrapper
+
+class StageProfiler:
+    """Wall time, CPU time and peak memory per pipeline stage per resume
+
+    Use `with profiler.track(filename): ...` around the work for one resume (or a batch
+    whose states carry resume_id). CPU time is the calling thread's, which is exact for a
+    stage because each stage runs in one thread. Peak memory comes from tracemalloc and is
+    only collected with track_memory=True: it slows allocation-heavy code noticeably, and
+    stages running at the same time (the keyword and semantic branches, or graph.batch)
+    see each other's allocations in their peaks.
+
+    Set profile_resume to a label to dump a cProfile (.prof) or, for a path ending in
+    .html, a pyinstrument profile of every stage run for that resume to profile_path.
+    """
+
+    def __init__(self, track_memory=False, log=False, profile_resume=None, profile_path="resume_profile.prof"):
+        self.track_memory = track_memory
+        self.log = log
+        self.profile_resume = profile_resume
+        self.profile_path = profile_path
+        self.records = []
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._profiles = []
+        self._started_tracing = False
+
+    @contextmanager
+    def track(self, resume=None):
+        """Attribute instrumented stages run inside the block to this profiler and resume label"""
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        token = _active.set((self, resume))
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    @contextmanager
+    def measure(self, resume, stage):
+        """Time the enclosed block as one stage of one resume"""
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            record = {
+                "resume": resume,
+                "stage": stage,
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": time.thread_time() - cpu,
+                "peak_bytes": max(0, tracemalloc.get_traced_memory()[1] - baseline) if tracing else None,
+            }
+            self.add([record])
+
+    def add(self, records):
+        """Append stage records, e.g. ones measured in an extraction worker process"""
+        with self._lock:
+            self.records.extend(records)
+        if self.log:
+            for record in records:
+                logger.info(json.dumps(record))
+
+    def _profile_call(self, func, *args, **kwargs):
+        # cProfile/pyinstrument follow one thread, so profiled stages take turns
+        with self._profile_lock:
+            if self.profile_path.endswith('.html'):
+                from pyinstrument import Profiler
+                profiler = Profiler()
+                start, stop = profiler.start, profiler.stop
+            else:
+                profiler = cProfile.Profile()
+                start, stop = profiler.enable, profiler.disable
+            start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stop()
+                self._profiles.append(profiler)
+                self._dump_profile()
+
+    def _dump_profile(self):
+        if self.profile_path.endswith('.html'):
+            from pyinstrument.renderers import HTMLRenderer
+            session = functools.reduce(type(self._profiles[0].last_session).combine,
+                                       [profile.last_session for profile in self._profiles])
+            with open(self.profile_path, 'w', encoding='utf-8') as f:
+                f.write(HTMLRenderer().render(session))
+        else:
+            stats = pstats.Stats(self._profiles[0])
+            for profile in self._profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(self.profile_path)
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def summary(self):
+        """One row per stage: count, p50/p95/total wall time, total CPU time and max peak memory"""
+        with self._lock:
+            records = list(self.records)
+        stages = {}
+        for record in records:
+            stages.setdefault(record["stage"], []).append(record)
+
+        rows = []
+        for stage, stage_records in stages.items():
+            walls = sorted(record["wall_s"] for record in stage_records)
+            peaks = [record["peak_bytes"] for record in stage_records if record["peak_bytes"] is not None]
+            rows.append({
+                "stage": stage,
+                "count": len(walls),
+                "p50_ms": statistics.median(walls) * 1000,
+                "p95_ms": walls[min(len(walls) - 1, int(len(walls) * 0.95))] * 1000,
+                "wall_s": sum(walls),
+                "cpu_s": sum(record["cpu_s"] for record in stage_records),
+                "peak_mb": max(peaks) / 2**20 if peaks else None,
+            })
+        return rows
+
+    def prometheus_text(self):
+        """Stage metrics in the Prometheus text exposition format (e.g. for a textfile collector)"""
+        lines = []
+        for metric, key, help_text in (("resume_stage_wall_seconds", "wall_s", "Wall time per pipeline stage"),
+                                       ("resume_stage_cpu_seconds", "cpu_s", "CPU time per pipeline stage")):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+            for stage, values in self._values_by_stage(key).items():
+                values.sort()
+                for quantile in (0.5, 0.95):
+                    value = values[min(len(values) - 1, int(len(values) * quantile))]
+                    lines.append(f'{metric}{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {sum(values):.6f}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {len(values)}')
+
+        peaks = self._values_by_stage("peak_bytes")
+        if any(peaks.values()):
+            lines += ["# HELP resume_stage_peak_memory_bytes Largest traced allocation peak per pipeline stage",
+                      "# TYPE resume_stage_peak_memory_bytes gauge"]
+            lines += [f'resume_stage_peak_memory_bytes{{stage="{stage}"}} {max(values)}'
+                      for stage, values in peaks.items() if values]
+        return '\n'.join(lines) + '\n'
+
+    def _values_by_stage(self, key):
+        values = {}
+        with self._lock:
+            for record in self.records:
+                values.setdefault(record["stage"], [])
+                if record[key] is not None:
+                    values[record["stage"]].append(record[key])
+        return values
+
+    def write(self, path):
+        """Write Prometheus text for a .prom path, otherwise one JSON record per line"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            if path.endswith('.prom'):
+                f.write(self.prometheus_text())
+            else:
+                with self._lock:
+                    f.writelines(json.dumps(record) + '\n' for record in self.records)
+        # Textfile collectors may read at any moment, so swap the file in whole
+        os.replace(path + '.tmp', path)
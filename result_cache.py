@@ -0,0 +1,152 @@
+import io
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import closing
+import numpy as np
+
+# Bump whenever extraction, embedding or scoring changes so stale entries are ignored
+PIPELINE_VERSION = "3"
+
+DEFAULT_CACHE_PATH = os.environ.get("RESUME_CACHE_PATH", os.path.join(".cache", "resume_analyzer.sqlite3"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+def hash_bytes(content):
+    """SHA-256 hex digest of raw bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+def hash_text(text):
+    """SHA-256 hex digest of text"""
+    return hash_bytes(text.encode('utf-8'))
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 hex digest of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ResultCache:
+    """Persistent SQLite cache for extracted text, resume embeddings, analysis results and LLM responses
+
+    Documents are keyed by the SHA-256 of the resume bytes, so they are reused across
+    job descriptions; results are keyed by resume hash + JD hash. Both carry the
+    pipeline version. LLM responses are keyed by a hash of the model and prompt alone.
+    Least recently used entries are evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, version=PIPELINE_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""CREATE TABLE IF NOT EXISTS documents (
+                key TEXT PRIMARY KEY, text TEXT, embedding BLOB, size INTEGER, last_access REAL)""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY, result TEXT, size INTEGER, last_access REAL)""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY, response TEXT, size INTEGER, last_access REAL)""")
+
+    def _connect(self):
+        # A connection per call keeps the cache safe to share across Streamlit script threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        return closing(conn)
+
+    def _document_key(self, resume_hash):
+        return f"{self.version}:{resume_hash}"
+
+    def _result_key(self, resume_hash, job_description):
+        return f"{self.version}:{resume_hash}:{hash_text(job_description)}"
+
+    def _get(self, table, column, key):
+        with self._connect() as conn, conn:
+            row = conn.execute(f"SELECT {column} FROM {table} WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] is None:
+                return None
+            conn.execute(f"UPDATE {table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def get_text(self, resume_hash):
+        """Cached extracted text for a resume, or None"""
+        return self._get("documents", "text", self._document_key(resume_hash))
+
+    def get_embedding(self, resume_hash):
+        """Cached resume embedding (a vector, or a chunks x dim matrix), or None"""
+        blob = self._get("documents", "embedding", self._document_key(resume_hash))
+        return np.load(io.BytesIO(blob)) if blob is not None else None
+
+    def get_result(self, resume_hash, job_description):
+        """Cached analysis result for a resume against a job description, or None"""
+        result = self._get("results", "result", self._result_key(resume_hash, job_description))
+        return json.loads(result) if result is not None else None
+
+    def get_llm_response(self, prompt_hash):
+        """Cached LLM response text for a prompt hash, or None"""
+        return self._get("llm_responses", "response", prompt_hash)
+
+    def put_document(self, resume_hash, text, embedding=None):
+        """Store extracted text and, optionally, the resume embedding"""
+        blob = None
+        if embedding is not None:
+            buffer = io.BytesIO()
+            np.save(buffer, np.asarray(embedding, dtype=np.float32))
+            blob = buffer.getvalue()
+        size = len(text.encode('utf-8')) + (len(blob) if blob else 0)
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (key, text, embedding, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self._document_key(resume_hash), text, blob, size, time.time())
+            )
+        self.evict()
+
+    def put_result(self, resume_hash, job_description, result):
+        """Store the JSON-serializable part of an analysis result"""
+        payload = json.dumps({k: v for k, v in result.items() if k != "prepared_job"})
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, size, last_access) VALUES (?, ?, ?, ?)",
+                (self._result_key(resume_hash, job_description), payload, len(payload), time.time())
+            )
+        self.evict()
+
+    def put_llm_response(self, prompt_hash, response):
+        """Store an LLM response under its prompt hash"""
+        size = len(response.encode('utf-8'))
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (prompt_hash, response, size, time.time())
+            )
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        with self._connect() as conn, conn:
+            total = conn.execute(
+                "SELECT COALESCE((SELECT SUM(size) FROM documents), 0) + COALESCE((SELECT SUM(size) FROM results), 0)"
+                " + COALESCE((SELECT SUM(size) FROM llm_responses), 0)"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = conn.execute(
+                "SELECT 'documents', key, size, last_access FROM documents "
+                "UNION ALL SELECT 'results', key, size, last_access FROM results "
+                "UNION ALL SELECT 'llm_responses', key, size, last_access FROM llm_responses ORDER BY last_access"
+            ).fetchall()
+            for table, key, size, _ in rows:
+                if total <= self.max_bytes:
+                    break
+                conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+                total -= size
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._connect() as conn, conn:
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM llm_responses")
@@ -1,38 +1,195 @@
 # Import all components
-from step3a_imports import AnalysisState, StateGraph, END
-from step3b_models import llm, semantic_model
-from step3c_utils import extract_text_from_file, extract_years_of_experience, clean_text_for_similarity
-from step3d_keyword_node import keyword_extraction_node
-from step3e_semantic_node import semantic_analysis_node
+from step3a_imports import AnalysisState, PreparedJob, StateGraph, START, END
+import step3b_models
+from step3b_models import get_llm, get_semantic_model
+from step3c_utils import extract_text_from_file, extract_texts_parallel, extract_years_of_experience, clean_text_for_similarity
+from step3d_keyword_node import keyword_extraction_node, match_skills
+from step3e_semantic_node import (semantic_analysis_node, encode_job_text, encode_resume_text,
+                                  similarity_from_embeddings, batch_semantic_similarity)
 from step3f_scoring_node import calculate_match_score_node
 from step3g_suggestion_node import generate_suggestions_node
+from step3h_llm_feedback_node import (llm_feedback_node, allm_feedback_node, generate_llm_feedback,
+                                      agenerate_llm_feedback, LLM_FEEDBACK_ENABLED)
+from langchain_core.runnables import RunnableLambda
+from result_cache import hash_bytes
+from resume_index import ResumeIndex
+from profiling import StageProfiler, instrument
 
 # Re-export key components for the main app
 __all__ = [
     'AnalysisState',
+    'PreparedJob',
+    'prepare_job',
+    'analyze_batch',
+    'analyze_file',
+    'analyze_indexed',
+    'ResumeIndex',
+    'StageProfiler',
     'resume_analyzer_app',
+    'generate_llm_feedback',
+    'agenerate_llm_feedback',
     'extract_text_from_file',
+    'extract_texts_parallel',
     'llm',
-    'semantic_model'
+    'semantic_model',
+    'get_llm',
+    'get_semantic_model'
 ]
 
-# Create LangGraph Workflow
-workflow = StateGraph(AnalysisState)
+def __getattr__(name):
+    # llm / semantic_model stay importable from here but load only on first access
+    if name in ("llm", "semantic_model"):
+        return getattr(step3b_models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Add nodes
-workflow.add_node("keyword_extraction", keyword_extraction_node)
-workflow.add_node("semantic_analysis", semantic_analysis_node)
-workflow.add_node("score_calculation", calculate_match_score_node)
-workflow.add_node("suggestion_generation", generate_suggestions_node)
+def prepare_job(job_description) -> PreparedJob:
+    """Analyze a job description once so every resume in a batch can reuse it"""
+    job_desc = job_description.lower()
+    job_clean = clean_text_for_similarity(job_description)
 
-# Build workflow
-workflow.set_entry_point("keyword_extraction")
-workflow.add_edge("keyword_extraction", "semantic_analysis")
-workflow.add_edge("semantic_analysis", "score_calculation")
-workflow.add_edge("score_calculation", "suggestion_generation")
-workflow.add_edge("suggestion_generation", END)
+    return {
+        "job_description": job_description,
+        "cleaned_text": job_clean,
+        "required_skills": match_skills(job_desc),
+        "job_years": extract_years_of_experience(job_desc),
+        "embedding": encode_job_text(job_clean)
+    }
+
+def build_workflow(llm_feedback=LLM_FEEDBACK_ENABLED):
+    """The LangGraph workflow; llm_feedback ends it with the AI feedback node"""
+    workflow = StateGraph(AnalysisState)
+
+    # Add nodes (instrumented: timed per resume only while a StageProfiler is tracking)
+    workflow.add_node("keyword_extraction", instrument("keyword_extraction", keyword_extraction_node))
+    workflow.add_node("semantic_analysis", instrument("semantic_analysis", semantic_analysis_node))
+    workflow.add_node("score_calculation", instrument("score_calculation", calculate_match_score_node))
+    workflow.add_node("suggestion_generation", instrument("suggestion_generation", generate_suggestions_node))
+
+    # Build workflow: keyword and semantic analysis are independent, so they fan out
+    # from the start and run concurrently (regex work overlaps with model inference,
+    # with invoke/batch as well as ainvoke/abatch); scoring waits for both
+    workflow.add_edge(START, "keyword_extraction")
+    workflow.add_edge(START, "semantic_analysis")
+    workflow.add_edge(["keyword_extraction", "semantic_analysis"], "score_calculation")
+    workflow.add_edge("score_calculation", "suggestion_generation")
+
+    # Optional AI feedback (LLM_FEEDBACK=1): sync and async implementations, so invoke/batch
+    # and ainvoke/abatch both work; with abatch the calls overlap up to LLM_CONCURRENCY
+    if llm_feedback:
+        workflow.add_node("llm_feedback", RunnableLambda(instrument("llm_feedback", llm_feedback_node),
+                                                         afunc=instrument("llm_feedback", allm_feedback_node),
+                                                         name="llm_feedback"))
+        workflow.add_edge("suggestion_generation", "llm_feedback")
+        workflow.add_edge("llm_feedback", END)
+    else:
+        workflow.add_edge("suggestion_generation", END)
+    return workflow
 
 # Compile the application
-resume_analyzer_app = workflow.compile()
+resume_analyzer_app = build_workflow().compile()
+# Without the feedback node, for callers that request feedback for a whole batch at once
+_analysis_app = build_workflow(llm_feedback=False).compile() if LLM_FEEDBACK_ENABLED else resume_analyzer_app
+
+# Embedding done outside the graph is instrumented as stages of its own
+_batch_semantic_similarity = instrument("batch_embedding", batch_semantic_similarity)
+_encode_resume_text = instrument("resume_embedding", encode_resume_text)
+
+def analyze_batch(resumes, job, batch_size=32, resume_ids=None):
+    """Analyze many resume texts against one job, embedding the resumes in batches
+
+    resume_ids, when given, label each resume's stages for a tracking StageProfiler.
+    """
+    if isinstance(job, str):
+        job = prepare_job(job)
+
+    similarities = _batch_semantic_similarity(resumes, job["embedding"], batch_size=batch_size)
+
+    states = [
+        {
+            "resume_text": resume_text,
+            "job_description": job["job_description"],
+            "prepared_job": job,
+            "semantic_similarity": similarity
+        }
+        for resume_text, similarity in zip(resumes, similarities)
+    ]
+    if resume_ids is not None:
+        for state, resume_id in zip(states, resume_ids):
+            state["resume_id"] = resume_id
+    return resume_analyzer_app.batch(states)
+
+def analyze_file(file_content, filename, job, cache=None, resume_text=None, llm_feedback=True):
+    """Analyze one resume file, reusing cached text, embedding and result when a cache is given
+
+    resume_text may be passed when the text was already extracted (e.g. in parallel).
+    llm_feedback=False skips the LLM_FEEDBACK node, for callers that request feedback for
+    all their results at once with generate_llm_feedback. Returns None when the file does
+    not contain enough text to analyze.
+    """
+    if isinstance(job, str):
+        job = prepare_job(job)
+
+    app = resume_analyzer_app if llm_feedback else _analysis_app
+    resume_hash = hash_bytes(file_content)
+    if cache is not None:
+        cached_result = cache.get_result(resume_hash, job["job_description"])
+        # A result cached without the feedback node is not reused when this run adds feedback
+        if cached_result is not None and (app is _analysis_app or "ai_feedback" in cached_result):
+            return cached_result
+
+    if resume_text is None and cache is not None:
+        resume_text = cache.get_text(resume_hash)
+    resume_embedding = cache.get_embedding(resume_hash) if cache is not None else None
+    if resume_text is None:
+        resume_text = extract_text_from_file(file_content, filename)
+
+    if not resume_text or len(resume_text.strip()) < 50:
+        return None
+
+    if resume_embedding is None:
+        resume_embedding = _encode_resume_text(resume_text)
+        if cache is not None:
+            cache.put_document(resume_hash, resume_text, resume_embedding)
+
+    result = app.invoke({
+        "resume_text": resume_text,
+        "job_description": job["job_description"],
+        "prepared_job": job,
+        "semantic_similarity": similarity_from_embeddings(resume_embedding, job["embedding"])
+    })
+    result.pop("prepared_job", None)
+
+    if cache is not None:
+        cache.put_result(resume_hash, job["job_description"], result)
+    return result
+
+def analyze_indexed(index, job, top_k=10):
+    """Shortlist an indexed resume pool by semantic similarity and fully analyze the top-k
+
+    Uses the stored text and embeddings, so nothing is re-extracted or re-encoded.
+    Results come back best match first.
+    """
+    if isinstance(job, str):
+        job = prepare_job(job)
+
+    hits = index.search(job, top_k=top_k)
+    results = resume_analyzer_app.batch([
+        {
+            "resume_text": record["text"],
+            "job_description": job["job_description"],
+            "prepared_job": job,
+            "semantic_similarity": similarity,
+            "resume_id": record["id"]
+        }
+        for record, similarity in hits
+    ])
+
+    for (record, _), result in zip(hits, results):
+        result.pop("prepared_job", None)
+        result["resume_filename"] = record.get("filename", record["id"])
+    return sorted(results, key=lambda result: result["match_percentage"], reverse=True)
 
-print("✅ Bulk Resume Analyzer built successfully!")
\ No newline at end of file
+if __name__ == "__main__":
+    # python -m resume_analyzer screen --jd jd.txt --resumes ./inbox --out results.xlsx
+    from batch_cli import main
+    main()
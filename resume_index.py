@@ -0,0 +1,150 @@
+import os
+import json
+import numpy as np
+from step3e_semantic_node import batch_encode_resumes, embedding_signature
+
+class ResumeIndex:
+    """Persistent embedding index for ranking one resume pool against many job descriptions
+
+    The index directory holds embeddings.npy, a float32 matrix with one L2-normalized
+    row per resume, memory-mapped on load, plus records.json with the id, text and
+    metadata of each row. Because rows are normalized, a JD is scored against the whole
+    pool with one matrix-vector product. The matrix can also be handed to
+    faiss.IndexFlatIP unchanged (see faiss_index). Chunked resume embeddings are stored
+    mean-pooled, one row per resume.
+
+    index.json records the embedding_signature() the vectors were made with. Opening an
+    index made with other embedding settings raises ValueError, since its rows cannot be
+    compared with JD vectors from the current model; with rebuild, it is opened empty
+    instead and replaced on the next save.
+    """
+
+    def __init__(self, directory, rebuild=False):
+        self.directory = directory
+        self.signature = embedding_signature()
+        self.records = []
+        self._matrix = None
+        # Rows added since the matrix was loaded, appended to it once when it is next needed
+        self._new_rows = []
+        self._positions = {}
+        if os.path.exists(self._records_path):
+            stored_signature = None
+            if os.path.exists(self._meta_path):
+                with open(self._meta_path, encoding='utf-8') as f:
+                    stored_signature = json.load(f).get("embedding_signature")
+            if stored_signature != self.signature:
+                if not rebuild:
+                    raise ValueError(f"Index {directory} was built with embedding settings "
+                                     f"{stored_signature or 'unknown'!r}, not the current {self.signature!r}; "
+                                     f"rebuild it or restore those settings")
+                return
+            with open(self._records_path, encoding='utf-8') as f:
+                self.records = json.load(f)
+            self._matrix = np.load(self._embeddings_path, mmap_mode='r')
+            self._positions = {record["id"]: i for i, record in enumerate(self.records)}
+
+    @property
+    def _records_path(self):
+        return os.path.join(self.directory, "records.json")
+
+    @property
+    def _embeddings_path(self):
+        return os.path.join(self.directory, "embeddings.npy")
+
+    @property
+    def _meta_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    @property
+    def embeddings(self):
+        """The float32 matrix of all rows (None while the index is empty)"""
+        if self._new_rows:
+            rows = np.vstack(self._new_rows)
+            self._matrix = rows if self._matrix is None else np.concatenate([self._matrix, rows])
+            self._new_rows = []
+        return self._matrix
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, resume_id):
+        return resume_id in self._positions
+
+    def add(self, items, batch_size=32):
+        """Embed and add (resume_id, resume_text, metadata) items; existing ids are replaced
+
+        Returns the number of resumes stored (texts too short to embed are skipped).
+        """
+        items = list(items)
+        embeddings = batch_encode_resumes([text for _, text, _ in items], batch_size=batch_size)
+
+        rows, records = [], []
+        for (resume_id, resume_text, metadata), embedding in zip(items, embeddings):
+            if embedding is None:
+                continue
+            embedding = np.asarray(embedding, dtype=np.float32)
+            if embedding.ndim == 2:
+                embedding = embedding.mean(axis=0)
+            rows.append(embedding / max(np.linalg.norm(embedding), 1e-12))
+            records.append({"id": resume_id, "text": resume_text, **(metadata or {})})
+        if not rows:
+            return 0
+
+        # New rows are only queued, so adding to a large index copies nothing; the stored
+        # matrix is read into memory only when one of its rows has to be replaced
+        stored = len(self._matrix) if self._matrix is not None else 0
+        for record, row in zip(records, rows):
+            position = self._positions.get(record["id"])
+            if position is None:
+                self._positions[record["id"]] = len(self.records)
+                self.records.append(record)
+                self._new_rows.append(row)
+                continue
+            self.records[position] = record
+            if position < stored:
+                if not self._matrix.flags.writeable:
+                    self._matrix = np.array(self._matrix)
+                self._matrix[position] = row
+            else:
+                self._new_rows[position - stored] = row
+        return len(rows)
+
+    def save(self):
+        """Write the matrix and records to the index directory"""
+        embeddings = self.embeddings
+        if embeddings is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to temporary files and swap them in: the current matrix may be a memory map
+        # of the file being replaced, and readers never see a half-written index
+        with open(self._embeddings_path + '.tmp', 'wb') as f:
+            np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+        with open(self._records_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.records, f)
+        with open(self._meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({"embedding_signature": self.signature}, f)
+        os.replace(self._embeddings_path + '.tmp', self._embeddings_path)
+        os.replace(self._records_path + '.tmp', self._records_path)
+        os.replace(self._meta_path + '.tmp', self._meta_path)
+        self._matrix = np.load(self._embeddings_path, mmap_mode='r')
+
+    def search(self, job, top_k=10):
+        """Top-k stored resumes for a prepared job, as (record, semantic_similarity) pairs"""
+        job_embedding = job["embedding"]
+        if job_embedding is None or not self.records:
+            return []
+
+        job_vector = np.asarray(job_embedding, dtype=np.float32).reshape(-1)
+        scores = self.embeddings @ (job_vector / max(np.linalg.norm(job_vector), 1e-12))
+
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.records[i], max(0.1, min(1.0, float(scores[i])))) for i in top]
+
+    def faiss_index(self):
+        """Build a faiss.IndexFlatIP over the stored rows (requires faiss)"""
+        import faiss
+        index = faiss.IndexFlatIP(self.embeddings.shape[1])
+        index.add(np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        return index
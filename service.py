@@ -0,0 +1,388 @@
+"""HTTP scoring service: the analysis pipeline behind a small JSON API
+
+    POST /score        {"job_description": ..., "resume_text": ...}
+                       or {"job_description": ..., "filename": "cv.pdf", "content_base64": ...}
+    POST /score/batch  {"job_description": ..., "resumes": [{"id": ..., "resume_text" | "filename" + "content_base64"}]}
+    GET  /health       200 once the model is loaded and warmed up
+    GET  /metrics      request latency histograms in the Prometheus text format
+
+Start it with `python -m resume_analyzer serve --port 8000 --workers 4`.
+"""
+import os
+import json
+import time
+import base64
+import signal
+import shutil
+import tempfile
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from resume_analyzer import prepare_job, analyze_batch, extract_texts_parallel, get_semantic_model
+from result_cache import hash_text
+from step3c_utils import MAX_FILE_BYTES
+from worker_pool import pin_torch_threads, prepare_fork
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUEST_BYTES = int(os.environ.get("SERVICE_MAX_REQUEST_BYTES", 64 * 1024 * 1024))
+MAX_BATCH_RESUMES = int(os.environ.get("SERVICE_MAX_BATCH_RESUMES", 1000))
+# Seconds one uploaded file may take to parse before its entry fails with a timeout
+EXTRACTION_TIMEOUT = int(os.environ.get("SERVICE_EXTRACTION_TIMEOUT", 30))
+# Prepared job descriptions (skills, years, embedding) kept per worker, least recently used dropped first
+JOB_CACHE_SIZE = 32
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class RequestMetrics:
+    """Per-endpoint request counts and latency histograms, in constant memory
+
+    With a directory, every worker process writes its series there after each request,
+    so whichever worker answers /metrics reports all of them.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, directory=None):
+        self.buckets = buckets
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, endpoint, status, seconds, resumes=0):
+        with self._lock:
+            series = self._series.setdefault(endpoint, {
+                "counts": [0] * len(self.buckets), "count": 0, "sum": 0.0, "errors": 0, "resumes": 0})
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["counts"][i] += 1
+            series["count"] += 1
+            series["sum"] += seconds
+            series["errors"] += status >= 400
+            series["resumes"] += resumes
+            if self.directory:
+                path = os.path.join(self.directory, f"{os.getpid()}.json")
+                with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(self._series, f)
+                os.replace(path + '.tmp', path)
+
+    def _series_by_worker(self):
+        with self._lock:
+            by_worker = {str(os.getpid()): json.loads(json.dumps(self._series))}
+        if self.directory:
+            for name in os.listdir(self.directory):
+                worker, extension = os.path.splitext(name)
+                if extension == '.json' and worker not in by_worker:
+                    try:
+                        with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                            by_worker[worker] = json.load(f)
+                    except (OSError, json.JSONDecodeError):
+                        continue
+        return by_worker
+
+    def prometheus_text(self):
+        """Histograms and counters in the Prometheus text exposition format, labelled by worker pid"""
+        series = {(endpoint, worker): values for worker, worker_series in self._series_by_worker().items()
+                  for endpoint, values in worker_series.items()}
+        lines = ["# HELP resume_service_request_seconds Request latency per endpoint",
+                 "# TYPE resume_service_request_seconds histogram"]
+        for (endpoint, worker), values in series.items():
+            labels = f'endpoint="{endpoint}",worker="{worker}"'
+            for bound, count in zip(self.buckets, values["counts"]):
+                lines.append(f'resume_service_request_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'resume_service_request_seconds_bucket{{{labels},le="+Inf"}} {values["count"]}')
+            lines.append(f'resume_service_request_seconds_sum{{{labels}}} {values["sum"]:.6f}')
+            lines.append(f'resume_service_request_seconds_count{{{labels}}} {values["count"]}')
+        lines += ["# HELP resume_service_errors_total Requests answered with a 4xx or 5xx status",
+                  "# TYPE resume_service_errors_total counter"]
+        lines += [f'resume_service_errors_total{{endpoint="{endpoint}",worker="{worker}"}} {values["errors"]}'
+                  for (endpoint, worker), values in series.items()]
+        lines += ["# HELP resume_service_resumes_total Resumes scored",
+                  "# TYPE resume_service_resumes_total counter"]
+        lines += [f'resume_service_resumes_total{{endpoint="{endpoint}",worker="{worker}"}} {values["resumes"]}'
+                  for (endpoint, worker), values in series.items()]
+        return '\n'.join(lines) + '\n'
+
+class BadRequest(ValueError):
+    """A request the client has to fix; answered with its status code and message"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class ScoringService:
+    """The pipeline state shared by every request of one worker process"""
+
+    def __init__(self, metrics_dir=None):
+        self.metrics = RequestMetrics(directory=metrics_dir)
+        self.ready = False
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._extraction_pool = None
+        self._extraction_workers = 1
+        self._extraction_lock = threading.Lock()
+
+    def start_extraction_pool(self, max_workers=None):
+        """Start this process's pool for parsing uploaded files, reused by every request
+
+        Call it in each worker process after forking (the pool's queues must not be
+        shared between workers) and before serving, so its processes are forked while the
+        worker is still single-threaded; only a parser crash starts a new pool later.
+        """
+        self._extraction_workers = max_workers or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(self._extraction_workers, mp_context=multiprocessing.get_context("fork"))
+        # A fork pool starts all of its processes on the first submit
+        pool.submit(os.getpid).result()
+        self._extraction_pool = pool
+
+    def close(self):
+        if self._extraction_pool is not None:
+            self._extraction_pool.shutdown(cancel_futures=True)
+
+    def _extract(self, files):
+        if self._extraction_pool is None:
+            with self._extraction_lock:
+                if self._extraction_pool is None:
+                    self.start_extraction_pool()
+        pool = self._extraction_pool
+        try:
+            return list(extract_texts_parallel(files, timeout=EXTRACTION_TIMEOUT, executor=pool))
+        except BrokenProcessPool:
+            # A parser crash in an earlier request broke the pool; the first request to notice replaces it
+            with self._extraction_lock:
+                if self._extraction_pool is pool:
+                    pool.shutdown(wait=False)
+                    self.start_extraction_pool(self._extraction_workers)
+            return list(extract_texts_parallel(files, timeout=EXTRACTION_TIMEOUT, executor=self._extraction_pool))
+
+    def warm_up(self):
+        """Load the embedding model and run one resume through the whole graph"""
+        start = time.perf_counter()
+        get_semantic_model()
+        warm_up_text = "Software Engineer with 5 years of experience in python, sql and project management. " * 3
+        analyze_batch([warm_up_text], prepare_job(warm_up_text))
+        self.ready = True
+        logger.info("Model loaded and warmed up in %.2f s", time.perf_counter() - start)
+
+    def job(self, job_description):
+        """prepare_job, reused across requests for the same job description"""
+        if not isinstance(job_description, str) or not job_description.strip():
+            raise BadRequest("job_description is required")
+        key = hash_text(job_description)
+        with self._jobs_lock:
+            job = self._jobs.pop(key, None)
+        if job is None:
+            job = prepare_job(job_description)
+        with self._jobs_lock:
+            self._jobs[key] = job
+            while len(self._jobs) > JOB_CACHE_SIZE:
+                self._jobs.pop(next(iter(self._jobs)))
+        return job
+
+    def score(self, payload):
+        result = self.score_batch({"job_description": payload.get("job_description"), "resumes": [payload]})["results"][0]
+        if result.get("error"):
+            raise BadRequest(result["error"], status=422)
+        return result
+
+    def score_batch(self, payload):
+        """Score many resumes against one JD; a resume that cannot be read gets an error entry"""
+        resumes = payload.get("resumes")
+        if not isinstance(resumes, list) or not resumes:
+            raise BadRequest("resumes must be a non-empty list")
+        if len(resumes) > MAX_BATCH_RESUMES:
+            raise BadRequest(f"at most {MAX_BATCH_RESUMES} resumes per batch", status=413)
+        job = self.job(payload.get("job_description"))
+
+        results = [None] * len(resumes)
+        resume_ids = [resume.get("id", i) if isinstance(resume, dict) else i for i, resume in enumerate(resumes)]
+        resume_texts, files = {}, []
+        for i, resume in enumerate(resumes):
+            try:
+                text, content = _resume_input(resume)
+            except Exception as e:
+                results[i] = {"id": resume_ids[i], "error": f"{type(e).__name__}: {e}"}
+                continue
+            if content is not None:
+                files.append((i, content, resume["filename"]))
+            else:
+                resume_texts[i] = text
+
+        # Uploaded files are parsed in worker processes, with a per-file timeout, so a
+        # pathological or crashing file only fails its own entry
+        if files:
+            for extraction in self._extract([(content, filename) for _, content, filename in files]):
+                i = files[extraction["index"]][0]
+                if extraction["error"]:
+                    results[i] = {"id": resume_ids[i], "error": extraction["error"]}
+                else:
+                    resume_texts[i] = extraction["text"]
+
+        texts, positions = [], []
+        for i, text in sorted(resume_texts.items()):
+            if not text or len(text.strip()) < 50:
+                results[i] = {"id": resume_ids[i], "error": "insufficient text content"}
+                continue
+            texts.append(text)
+            positions.append((i, resume_ids[i]))
+
+        if texts:
+            for (i, resume_id), result in zip(positions, analyze_batch(texts, job)):
+                for key in ("prepared_job", "job_description", "resume_text"):
+                    result.pop(key, None)
+                results[i] = dict(result, id=resume_id)
+        return {"results": results}
+
+def _resume_input(resume):
+    # (resume_text, None) for a text resume, (None, file bytes) for an uploaded file
+    if not isinstance(resume, dict):
+        raise BadRequest("each resume must be an object")
+    if resume.get("resume_text") is not None:
+        return resume["resume_text"], None
+    if resume.get("content_base64") is None or not resume.get("filename"):
+        raise BadRequest("a resume needs resume_text, or filename and content_base64")
+    content = base64.b64decode(resume["content_base64"], validate=True)
+    if len(content) > MAX_FILE_BYTES:
+        raise BadRequest(f"{resume['filename']} is larger than {MAX_FILE_BYTES} bytes", status=413)
+    return None, content
+
+def make_handler(service):
+    """A request handler class bound to one ScoringService"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send(200 if service.ready else 503, {"status": "ok" if service.ready else "loading"})
+            elif self.path == "/metrics":
+                self._send(200, service.metrics.prometheus_text(), content_type="text/plain; version=0.0.4")
+            else:
+                self._send(404, {"error": f"no such endpoint: {self.path}"})
+
+        def do_POST(self):
+            routes = {"/score": service.score, "/score/batch": service.score_batch}
+            if self.path not in routes:
+                # The body is left unread, so the connection cannot carry another request
+                self.close_connection = True
+                self._send(404, {"error": f"no such endpoint: {self.path}"})
+                return
+            start = time.perf_counter()
+            status, resumes = 200, 0
+            try:
+                payload = self._read_json()
+                response = routes[self.path](payload)
+                resumes = len(response.get("results", [response]))
+            except BadRequest as e:
+                status, response = e.status, {"error": str(e)}
+            except Exception as e:
+                logger.exception("Scoring failed")
+                status, response = 500, {"error": f"{type(e).__name__}: {e}"}
+            if status != 200:
+                # The body may be partly unread; its remaining bytes must not parse as the next request
+                self.close_connection = True
+            self._send(status, response)
+            service.metrics.observe(self.path, status, time.perf_counter() - start, resumes)
+
+        def _read_json(self):
+            try:
+                length = int(self.headers["Content-Length"])
+            except (TypeError, ValueError):
+                raise BadRequest("a numeric Content-Length header is required")
+            if length < 0:
+                raise BadRequest("Content-Length must not be negative")
+            if length > MAX_REQUEST_BYTES:
+                raise BadRequest(f"request body over {MAX_REQUEST_BYTES} bytes", status=413)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"null")
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise BadRequest(f"invalid JSON: {e}")
+            if not isinstance(payload, dict):
+                raise BadRequest("request body must be a JSON object")
+            return payload
+
+        def _send(self, status, body, content_type="application/json"):
+            data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body, default=float).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            logger.info("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+def serve(host="127.0.0.1", port=8000, workers=1):
+    """Load and warm the model, then serve requests from `workers` processes
+
+    The socket is bound and the model loaded before forking, so every worker inherits
+    both and starts answering at once; each worker handles requests on threads and
+    records its metrics (labelled by pid) in a shared temporary directory. A worker that
+    dies is replaced. Platforms without fork run a single process.
+    """
+    forking = workers > 1 and hasattr(os, "fork")
+    metrics_dir = tempfile.mkdtemp(prefix="resume_service_metrics_") if forking else None
+    if forking:
+        prepare_fork()
+    service = ScoringService(metrics_dir)
+    service.warm_up()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    logger.info("Serving on http://%s:%d with %d worker(s)", host, server.server_address[1], workers)
+
+    if not forking:
+        service.start_extraction_pool()
+        try:
+            server.serve_forever()
+        finally:
+            service.close()
+            server.server_close()
+        return
+
+    children = set()
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # Unwind on SIGTERM so the worker's extraction processes are shut down with it
+            signal.signal(signal.SIGTERM, stop)
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            pin_torch_threads(threads)
+            service.start_extraction_pool(threads)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                service.close()
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        spawn()
+    try:
+        while children:
+            pid, _ = os.wait()
+            children.discard(pid)
+            logger.warning("Worker %d exited; starting a replacement", pid)
+            spawn()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # A second signal must not interrupt the shutdown itself
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        server.server_close()
+        shutil.rmtree(metrics_dir, ignore_errors=True)
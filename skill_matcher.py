@@ -0,0 +1,130 @@
+import os
+import re
+import tempfile
+import threading
+import numpy as np
+import step3b_models
+from step3b_models import get_semantic_model
+from result_cache import hash_text
+
+# Optional fuzzy skill matching (SEMANTIC_SKILLS=1): phrases like "k8s", "postgres" or
+# "people analytics" resolve to the nearest vocabulary skill by embedding similarity
+SEMANTIC_SKILLS_ENABLED = os.environ.get("SEMANTIC_SKILLS", "0") == "1"
+SKILL_MATCH_THRESHOLD = float(os.environ.get("SKILL_MATCH_THRESHOLD", 0.75))
+SKILL_EMBEDDINGS_DIR = os.environ.get("SKILL_EMBEDDINGS_DIR", os.path.join(".cache", "skill_embeddings"))
+MAX_PHRASE_WORDS = 4
+# Resolved phrases are remembered across resumes; most phrases recur from resume to resume
+PHRASE_CACHE_SIZE = 50_000
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'for', 'to', 'in', 'on', 'at', 'by', 'with', 'from', 'as', 'into',
+    'is', 'are', 'was', 'were', 'be', 'been', 'i', 'my', 'we', 'our', 'it', 'its', 'this', 'that', 'using',
+    'used', 'use', 'including', 'such', 'via', 'over', 'across', 'within', 'years', 'year', 'experience'
+}
+# Phrases never span punctuation; a '.' only ends one at the end of a sentence, not in 'node.js'
+_SEGMENT_BREAK_RE = re.compile(r'[\n,;:|•·()\[\]/!?]|\.(?=\s|$)')
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#.\-]*')
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+def candidate_phrases(text, max_words=MAX_PHRASE_WORDS):
+    """Short noun-phrase-like spans of lowercased text: every span of 1 to max_words words
+    within a run between punctuation and stopwords, each once, in order of appearance"""
+    phrases = {}
+    for segment in _SEGMENT_BREAK_RE.split(text):
+        run = []
+        for token in _TOKEN_RE.findall(segment) + [None]:
+            if token is None or token in STOPWORDS or token.isdigit():
+                # "led people analytics team" yields "people analytics" among its sub-spans
+                for start in range(len(run)):
+                    for end in range(start + 1, min(start + max_words, len(run)) + 1):
+                        phrases.setdefault(' '.join(run[start:end]), None)
+                run = []
+            else:
+                run.append(token)
+    return list(phrases)
+
+class SemanticSkillMatcher:
+    """Resolve free-text phrases to vocabulary skills with one matrix product
+
+    The vocabulary is embedded once and saved under SKILL_EMBEDDINGS_DIR, keyed by the
+    vocabulary and the embedding backend, so later processes load the matrix instead of
+    re-encoding it. A resume's candidate phrases are embedded in a single batch; each
+    maps to its most similar skill when the cosine similarity reaches the threshold.
+    """
+
+    def __init__(self, vocabulary, threshold=SKILL_MATCH_THRESHOLD, cache_dir=SKILL_EMBEDDINGS_DIR):
+        self.vocabulary = list(vocabulary)
+        self.threshold = threshold
+        self._vocabulary_set = set(self.vocabulary)
+        self._phrases = {}
+        self.matrix = self._load_matrix(cache_dir)
+
+    def _load_matrix(self, cache_dir):
+        key = hash_text('\n'.join([step3b_models.EMBEDDING_BACKEND, step3b_models.ONNX_MODEL_FILE] + self.vocabulary))
+        path = os.path.join(cache_dir, f"{key[:16]}.npy") if cache_dir else None
+        if path and os.path.exists(path):
+            return np.load(path)
+
+        matrix = np.asarray(get_semantic_model().encode(self.vocabulary, batch_size=64), dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a file of this process's own, then rename, so concurrent readers
+            # never see a partial matrix and concurrent writers never share a temp file
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.npy')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, matrix)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return matrix
+
+    def resolve(self, phrases, batch_size=64):
+        """Map each phrase to its nearest skill above the threshold, or None"""
+        # A local reference stays valid if another thread swaps in a fresh cache meanwhile
+        phrase_cache = self._phrases
+        resolved = {phrase: phrase_cache[phrase] for phrase in dict.fromkeys(phrases) if phrase in phrase_cache}
+        unknown = [phrase for phrase in dict.fromkeys(phrases) if phrase not in resolved]
+        if unknown:
+            embeddings = np.atleast_2d(np.asarray(get_semantic_model().encode(unknown, batch_size=batch_size),
+                                                  dtype=np.float32))
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            # (phrases x dim) @ (dim x skills): every phrase against every skill at once
+            similarities = embeddings @ self.matrix.T
+            best = similarities.argmax(axis=1)
+            scores = similarities[np.arange(len(unknown)), best]
+            new = {phrase: self.vocabulary[skill] if score >= self.threshold else None
+                   for phrase, skill, score in zip(unknown, best, scores)}
+            resolved.update(new)
+            if len(phrase_cache) + len(new) > PHRASE_CACHE_SIZE:
+                self._phrases = new
+            else:
+                phrase_cache.update(new)
+        return [resolved[phrase] for phrase in phrases]
+
+    def find_skills(self, text, exact_skills=()):
+        """Skills found in lowercased text semantically, added to those already matched exactly
+
+        Phrases that are vocabulary skills themselves are left to the exact matcher.
+        """
+        found = set(exact_skills)
+        phrases = [phrase for phrase in candidate_phrases(text) if phrase not in self._vocabulary_set]
+        found.update(skill for skill in self.resolve(phrases) if skill is not None)
+        return [skill for skill in self.vocabulary if skill in found]
+
+def get_skill_matcher(vocabulary):
+    """The shared SemanticSkillMatcher for a vocabulary, built (or loaded from disk) on first use"""
+    key = tuple(vocabulary)
+    if key not in _matchers:
+        with _matchers_lock:
+            if key not in _matchers:
+                _matchers[key] = SemanticSkillMatcher(vocabulary)
+    return _matchers[key]
+
+def skill_matching_signature():
+    """Short description of the skill matching settings, for cache keys"""
+    return f"semantic-skills-{SKILL_MATCH_THRESHOLD}" if SEMANTIC_SKILLS_ENABLED else "exact-skills"
@@ -1,10 +1,15 @@
 from typing import TypedDict, List, Dict, Any
-from langgraph.graph import StateGraph, END
-from langchain_groq import ChatGroq
+from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import SystemMessage, HumanMessage
-from sentence_transformers import SentenceTransformer, util
 import re
 
+class PreparedJob(TypedDict):
+    job_description: str
+    cleaned_text: str
+    required_skills: List[str]
+    job_years: int
+    embedding: Any
+
 class AnalysisState(TypedDict):
     resume_text: str
     job_description: str
@@ -17,4 +22,8 @@ class AnalysisState(TypedDict):
     total_experience: int
     current_position: str
     education: List[str]
-    general_feedback: str
\ No newline at end of file
+    general_feedback: str
+    score_signals: Dict
+    ai_feedback: str
+    prepared_job: PreparedJob
+    resume_id: str
\ No newline at end of file
@@ -1,12 +1,128 @@
-from step3a_imports import AnalysisState, ChatGroq, SentenceTransformer
-
-# Initialize AI Models
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2
-)
-
-semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
\ No newline at end of file
+import os
+import threading
+import numpy as np
+
+# Models are created on first use, then shared process-wide, so importing the
+# pipeline (or only text extraction) never pays the torch / Groq client cost
+LLM_MODEL_NAME = "llama-3.3-70b-versatile"
+SEMANTIC_MODEL_NAME = 'all-MiniLM-L6-v2'
+SEMANTIC_MODEL_REPO = 'sentence-transformers/all-MiniLM-L6-v2'
+MAX_SEQ_LENGTH = 256
+
+# Embedding backend: "sentence-transformers" (PyTorch), "onnx" (ONNX Runtime running an
+# int8-quantized export of the same model) or "fastembed". All of them return the
+# model's L2-normalized embeddings through a SentenceTransformer-style encode()
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "sentence-transformers")
+# File in the model repo (or a local path); use onnx/model_qint8_avx512_vnni.onnx or
+# onnx/model_qint8_arm64.onnx on CPUs that support them
+ONNX_MODEL_FILE = os.environ.get("ONNX_MODEL_FILE", "onnx/model_quint8_avx2.onnx")
+
+_model_lock = threading.Lock()
+_llm = None
+_semantic_models = {}
+
+def get_llm():
+    """Return the Groq chat model, creating it on first use"""
+    global _llm
+    if _llm is None:
+        with _model_lock:
+            if _llm is None:
+                from langchain_groq import ChatGroq
+                _llm = ChatGroq(
+                    model=LLM_MODEL_NAME,
+                    temperature=0,
+                    max_tokens=None,
+                    timeout=None,
+                    max_retries=2
+                )
+    return _llm
+
+class SentenceTransformerBackend:
+    """Full-precision PyTorch SentenceTransformer"""
+
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(SEMANTIC_MODEL_NAME)
+
+    def encode(self, texts, batch_size=32):
+        return self.model.encode(texts, batch_size=batch_size)
+
+class OnnxBackend:
+    """Quantized ONNX export of the model run with ONNX Runtime, plus the model's mean pooling"""
+
+    def __init__(self, model_file=ONNX_MODEL_FILE):
+        import onnxruntime
+        from tokenizers import Tokenizer
+        from huggingface_hub import hf_hub_download
+
+        if os.path.exists(model_file):
+            model_path = model_file
+            tokenizer_path = os.path.join(os.path.dirname(model_file), "tokenizer.json")
+        else:
+            model_path = hf_hub_download(SEMANTIC_MODEL_REPO, model_file)
+            tokenizer_path = hf_hub_download(SEMANTIC_MODEL_REPO, "tokenizer.json")
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        # Same limits as the SentenceTransformer: truncate at 256 word-pieces, pad per batch
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        self.session = onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts, batch_size=32):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+            attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            batches.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+
+        embeddings = np.vstack(batches).astype(np.float32) if batches else np.empty((0, 384), np.float32)
+        return embeddings[0] if single else embeddings
+
+class FastEmbedBackend:
+    """fastembed's ONNX build of the model"""
+
+    def __init__(self):
+        from fastembed import TextEmbedding
+        self.model = TextEmbedding(SEMANTIC_MODEL_REPO)
+
+    def encode(self, texts, batch_size=32):
+        single = isinstance(texts, str)
+        embeddings = np.array(list(self.model.embed([texts] if single else list(texts), batch_size=batch_size)),
+                              dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
+EMBEDDING_BACKENDS = {
+    "sentence-transformers": SentenceTransformerBackend,
+    "onnx": OnnxBackend,
+    "fastembed": FastEmbedBackend,
+}
+
+def get_semantic_model(backend=None):
+    """Return the embedding backend (EMBEDDING_BACKEND by default), loading it on first use"""
+    backend = backend or EMBEDDING_BACKEND
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}; expected one of {', '.join(EMBEDDING_BACKENDS)}")
+    if backend not in _semantic_models:
+        with _model_lock:
+            if backend not in _semantic_models:
+                _semantic_models[backend] = EMBEDDING_BACKENDS[backend]()
+    return _semantic_models[backend]
+
+def __getattr__(name):
+    # Keep `step3b_models.llm` / `step3b_models.semantic_model` working, loaded lazily
+    if name == "llm":
+        return get_llm()
+    if name == "semantic_model":
+        return get_semantic_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
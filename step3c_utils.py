@@ -1,29 +1,322 @@
 import re
 import io
+import os
+import contextlib
+import signal
+from datetime import datetime
+from typing import TypedDict, List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from PyPDF2 import PdfReader
 from docx import Document
+from profiling import StageProfiler, instrument
 
-def extract_text_from_file(file_content, filename):
-    """Extract text from PDF, DOCX, or TXT files"""
-    if filename.endswith('.pdf'):
-        reader = PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-        return text
-    elif filename.endswith('.docx'):
+# Extraction budgets: oversized files are rejected before parsing, and parsing stops
+# once enough pages or characters have been read (a resume never needs more)
+MAX_FILE_BYTES = int(os.environ.get("MAX_FILE_BYTES", 10 * 1024 * 1024))
+MAX_PAGES = int(os.environ.get("MAX_PAGES", 20))
+MAX_TEXT_CHARS = int(os.environ.get("MAX_TEXT_CHARS", 50_000))
+PDF_BACKEND = os.environ.get("PDF_BACKEND", "pypdf2")
+
+def extraction_signature():
+    """Short description of the extraction settings, for cache keys"""
+    return f"{PDF_BACKEND}-{MAX_PAGES}p-{MAX_TEXT_CHARS}c"
+
+def _pypdf2_pages(file_content, max_pages):
+    reader = PdfReader(io.BytesIO(file_content))
+    for page in reader.pages[:max_pages]:
+        yield page.extract_text() or ""
+
+def _pypdfium2_pages(file_content, max_pages):
+    # PDFium's C++ text extraction, typically several times faster than PyPDF2
+    import pypdfium2
+    pdf = pypdfium2.PdfDocument(file_content)
+    try:
+        for index in range(min(len(pdf), max_pages)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            page.close()
+            yield text.replace('\r\n', '\n')
+    finally:
+        pdf.close()
+
+def _pdfminer_pages(file_content, max_pages):
+    # Slower, but keeps reading order on multi-column layouts
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    for layout in extract_pages(io.BytesIO(file_content), maxpages=max_pages):
+        yield ''.join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+PDF_BACKENDS = {
+    'pypdf2': _pypdf2_pages,
+    'pypdfium2': _pypdfium2_pages,
+    'pdfminer': _pdfminer_pages,
+}
+
+def decode_text(file_content):
+    """Decode plain-text bytes: UTF-8 (with or without BOM), UTF-16 with a BOM, else Windows-1252"""
+    if file_content.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return file_content.decode('utf-16', errors='replace')
+    try:
+        return file_content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return file_content.decode('cp1252', errors='replace')
+
+def iter_text_pages(file_content, filename, max_pages=MAX_PAGES, pdf_backend=None):
+    """Yield the text of a file piece by piece: PDF pages, DOCX paragraphs, or the whole TXT
+
+    Pages are parsed lazily, so a consumer that stops early never parses the rest.
+    Raises ValueError for files over MAX_FILE_BYTES and unknown PDF backends.
+    """
+    if len(file_content) > MAX_FILE_BYTES:
+        raise ValueError(f"{filename} is {len(file_content) / 1024 / 1024:.1f} MB, "
+                         f"over the {MAX_FILE_BYTES / 1024 / 1024:.0f} MB limit")
+    extension = filename.lower()
+    if extension.endswith('.pdf'):
+        pdf_backend = pdf_backend or PDF_BACKEND
+        if pdf_backend not in PDF_BACKENDS:
+            raise ValueError(f"Unknown PDF backend {pdf_backend!r}; expected one of {', '.join(PDF_BACKENDS)}")
+        yield from PDF_BACKENDS[pdf_backend](file_content, max_pages)
+    elif extension.endswith('.docx'):
         doc = Document(io.BytesIO(file_content))
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text
+        for paragraph in doc.paragraphs:
+            yield paragraph.text
     else:
-        return file_content.decode('utf-8')
+        yield decode_text(file_content)
+
+@instrument("text_extraction")
+def extract_text_from_file(file_content, filename, max_chars=MAX_TEXT_CHARS, max_pages=MAX_PAGES, pdf_backend=None):
+    """Extract text from PDF, DOCX, or TXT files, up to max_chars characters and max_pages PDF pages"""
+    separator = '\n'
+    pieces = []
+    length = 0
+    for piece in iter_text_pages(file_content, filename, max_pages, pdf_backend):
+        if length + len(piece) >= max_chars:
+            pieces.append(piece[:max_chars - length])
+            break
+        pieces.append(piece)
+        length += len(piece) + len(separator)
+    return separator.join(pieces)
+
+def _extract_text_worker(file_content, filename, timeout, profile=False):
+    """Process-pool entry point: extract one file, reading it from disk when given a path
+
+    Returns (text, stage records); the records are measured here in the worker when
+    profile is set, since the parent's profiler cannot see into this process.
+    """
+    # SIGALRM bounds the time spent on a single file where the platform supports it
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        def on_timeout(signum, frame):
+            raise TimeoutError(f"extraction exceeded {timeout}s")
+        signal.signal(signal.SIGALRM, on_timeout)
+        signal.alarm(int(timeout))
+    try:
+        profiler = StageProfiler(track_memory=True) if profile else None
+        with profiler.track(filename) if profile else contextlib.nullcontext():
+            if isinstance(file_content, str):
+                # Check the size on disk so an oversized file is never read into memory
+                size = os.path.getsize(file_content)
+                if size > MAX_FILE_BYTES:
+                    raise ValueError(f"{filename} is {size / 1024 / 1024:.1f} MB, "
+                                     f"over the {MAX_FILE_BYTES / 1024 / 1024:.0f} MB limit")
+                with open(file_content, 'rb') as f:
+                    file_content = f.read()
+            text = extract_text_from_file(file_content, filename)
+        return text, profiler.records if profile else []
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+def _extract_isolated(index, file_content, filename, timeout, profile):
+    """Retry one file in its own single-worker pool so a crash only affects that file"""
+    try:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            text, stages = pool.submit(_extract_text_worker, file_content, filename, timeout, profile).result()
+        return {"index": index, "filename": filename, "text": text, "error": None, "stages": stages}
+    except Exception as e:
+        return {"index": index, "filename": filename, "text": None, "error": f"{type(e).__name__}: {e}", "stages": []}
+
+def extract_texts_parallel(files, max_workers=None, timeout=60, profile=False, executor=None):
+    """Extract text from many files across a process pool, yielding results as they finish
+
+    files is an iterable of (file_content, filename) pairs where file_content is either
+    bytes or a path to read. Each result is a dict with the input index, filename, text and
+    error; a file that fails, times out or crashes its worker is reported instead of
+    stopping the batch. With profile set, each result also carries the worker's
+    text_extraction stage records (see StageProfiler.add); otherwise "stages" is empty.
+    Closing the generator early cancels the files that have not started. A long-lived
+    ProcessPoolExecutor may be passed as executor to reuse its workers across calls; it
+    is left running (once a crash has broken it, submitting raises BrokenProcessPool).
+    """
+    files = list(files)
+    max_workers = max_workers or min(len(files), os.cpu_count() or 1) or 1
+    crashed = []
+
+    pool = executor or ProcessPoolExecutor(max_workers=max_workers)
+    futures = {}
+    finished = False
+    try:
+        futures = {
+            pool.submit(_extract_text_worker, content, name, timeout, profile): (index, content, name)
+            for index, (content, name) in enumerate(files)
+        }
+        for future in as_completed(futures):
+            index, content, name = futures[future]
+            try:
+                text, stages = future.result()
+                yield {"index": index, "filename": name, "text": text, "error": None, "stages": stages}
+            except BrokenProcessPool:
+                # A worker died (e.g. a parser segfault); every pending file fails with it
+                crashed.append((index, content, name))
+            except Exception as e:
+                yield {"index": index, "filename": name, "text": None, "error": f"{type(e).__name__}: {e}", "stages": []}
+        finished = True
+    finally:
+        # A caller that stops iterating early (closing the generator) drops the files
+        # not started yet instead of waiting for the whole batch
+        if executor is None:
+            pool.shutdown(wait=finished, cancel_futures=not finished)
+        elif not finished:
+            for future in futures:
+                future.cancel()
+
+    for index, content, name in crashed:
+        yield _extract_isolated(index, content, name, timeout, profile)
+
+# Section headings recognised by parse_resume (compared after stripping punctuation)
+SECTION_HEADINGS = {
+    'experience': ['experience', 'work experience', 'professional experience', 'employment history',
+                   'work history', 'career history', 'employment', 'relevant experience'],
+    'education': ['education', 'academic background', 'academic qualifications', 'qualifications',
+                  'academics', 'education and training', 'educational background'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies', 'competencies',
+               'skills and expertise', 'expertise'],
+    # Headings that only close the previous section
+    'other': ['summary', 'professional summary', 'profile', 'objective', 'career objective', 'projects',
+              'certifications', 'certificates', 'awards', 'achievements', 'languages', 'interests',
+              'hobbies', 'references', 'publications', 'volunteer', 'volunteering', 'training',
+              'personal details', 'personal information', 'contact']
+}
+_HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+NAME_EXCLUDED_KEYWORDS = ['resume', 'cv', 'curriculum', 'vitae', 'linkedin', 'email', 'phone', 'mobile', '@',
+                          'objective', 'summary', 'experience', 'education', 'skills', 'certification']
+
+POSITION_KEYWORDS = [
+    'manager', 'engineer', 'developer', 'analyst', 'specialist', 'consultant',
+    'director', 'head', 'lead', 'architect', 'officer', 'executive',
+    'president', 'ceo', 'cto', 'cfo', 'vp', 'assistant', 'coordinator'
+]
+
+COMPANY_INDICATORS = [
+    'ltd', 'limited', 'inc', 'corporation', 'corp', 'company', 'group',
+    'technologies', 'solutions', 'systems', 'international', 'global'
+]
+
+EDUCATION_KEYWORDS = [
+    'bachelor', 'bsc', 'bs', 'b.tech', 'btech', 'be',
+    'master', 'msc', 'ms', 'm.tech', 'mtech', 'me', 'mba',
+    'phd', 'ph.d', 'doctorate',
+    'university', 'college', 'institute', 'school',
+    'degree', 'graduated', 'education'
+]
+
+INSTITUTION_KEYWORDS = ['university', 'college', 'institute', 'school']
+
+# Words marking a line's date range as a study period; matched as whole words, and
+# without the short degree abbreviations ('be', 'me', 'ms') that also occur in job lines
+EDUCATION_DATE_KEYWORDS = [
+    'bachelor', 'bachelors', 'bsc', 'b.tech', 'btech', 'master', 'masters', 'msc', 'm.tech', 'mtech', 'mba',
+    'phd', 'ph.d', 'doctorate', 'university', 'college', 'institute', 'school', 'degree', 'graduated',
+    'education', 'matric', 'matriculation', 'fsc', 'ssc', 'hssc', 'o level', 'o levels', 'a level', 'a levels', 'gcse'
+]
+
+def _substring_regex(keywords):
+    # One compiled search replaces any(keyword in line for keyword in keywords)
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+_NAME_EXCLUDED_RE = _substring_regex(NAME_EXCLUDED_KEYWORDS)
+_POSITION_RE = _substring_regex(POSITION_KEYWORDS)
+_COMPANY_RE = _substring_regex(COMPANY_INDICATORS)
+_NOT_COMPANY_RE = _substring_regex(POSITION_KEYWORDS + ['email', 'phone'])
+_EDUCATION_RE = _substring_regex(EDUCATION_KEYWORDS)
+_INSTITUTION_RE = _substring_regex(INSTITUTION_KEYWORDS)
+_EDUCATION_DATE_RE = re.compile(r'(?<!\w)(?:' + '|'.join(re.escape(keyword) for keyword in EDUCATION_DATE_KEYWORDS)
+                                + r')(?!\w)')
+_DEGREE_RE = re.compile(r'\b(bachelor|bsc|bs|b\.?tech|be)\b|\b(master|msc|ms|m\.?tech|me|mba)\b|\b(phd|ph\.d|doctorate)\b')
+_NAME_PATTERNS = [
+    re.compile(r'^[A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?(?:\s+[A-Z][a-z]+)?$', re.MULTILINE),  # At beginning of line
+    re.compile(r'\n([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?(?:\s+[A-Z][a-z]+)?)\n')  # Between newlines
+]
+_HEADING_CLEAN_RE = re.compile(r'[^a-z& ]')
+
+class ParsedResume(TypedDict):
+    text: str
+    text_lower: str
+    lines: List[str]
+    lines_lower: List[str]
+    sections: Dict[str, Tuple[int, int]]
+
+def parse_resume(text) -> ParsedResume:
+    """Split a resume into normalized lines and locate its sections in a single pass
+
+    sections maps 'experience', 'education' and 'skills' to (start, end) line ranges
+    that exclude the heading line; only the first occurrence of each is kept.
+    """
+    lines = []
+    lines_lower = []
+    sections = {}
+    current, current_start = None, 0
+
+    for raw_line in text.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            continue
+        line_lower = line.lower()
+
+        section = None
+        if len(line) < 40:
+            section = _HEADING_TO_SECTION.get(' '.join(_HEADING_CLEAN_RE.sub('', line_lower).split()))
+        if section:
+            if current and current not in sections:
+                sections[current] = (current_start, len(lines))
+            current, current_start = section, len(lines) + 1
+
+        lines.append(line)
+        lines_lower.append(line_lower)
+
+    if current and current not in sections:
+        sections[current] = (current_start, len(lines))
+    sections.pop('other', None)
+
+    return {
+        "text": text,
+        "text_lower": '\n'.join(lines_lower),
+        "lines": lines,
+        "lines_lower": lines_lower,
+        "sections": sections
+    }
+
+def _as_parsed(text):
+    return text if isinstance(text, dict) else parse_resume(text)
+
+def _section_lines(parsed, section):
+    """(lines, lines_lower) of a detected section, or of the whole resume when it has none"""
+    if section in parsed["sections"]:
+        start, end = parsed["sections"][section]
+        if end > start:
+            return parsed["lines"][start:end], parsed["lines_lower"][start:end]
+    return parsed["lines"], parsed["lines_lower"]
 
 def extract_candidate_name(text):
     """Extract candidate name using improved logic without spaCy"""
+    parsed = _as_parsed(text)
+
     # Look for name patterns in first few non-empty lines
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    
-    for i, line in enumerate(lines[:15]):  # Check first 15 non-empty lines
+    for line, line_lower in zip(parsed["lines"][:15], parsed["lines_lower"][:15]):  # Check first 15 non-empty lines
         words = line.split()
         if 2 <= len(words) <= 4:
             # Check if line looks like a name (contains at least one capital letter, no digits, reasonable length)
@@ -31,178 +324,214 @@ def extract_candidate_name(text):
                 not any(char.isdigit() for char in line) and
                 len(line) < 50 and
                 any(word[0].isupper() for word in words) and
-                not any(keyword in line.lower() for keyword in
-                       ['resume', 'cv', 'curriculum', 'vitae', 'linkedin', 'email', 'phone', 'mobile', '@',
-                        'objective', 'summary', 'experience', 'education', 'skills', 'certification'])):
+                not _NAME_EXCLUDED_RE.search(line_lower)):
                 return line
-    
+
     # Fallback: Look for common name patterns in the first 1000 characters
-    first_part = text[:1000]
+    first_part = parsed["text"][:1000]
     # Pattern for typical names (Title Case words)
-    name_patterns = [
-        r'^[A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?(?:\s+[A-Z][a-z]+)?$',  # At beginning of line
-        r'\n([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?(?:\s+[A-Z][a-z]+)?)\n'  # Between newlines
-    ]
-    
-    for pattern in name_patterns:
-        matches = re.findall(pattern, first_part, re.MULTILINE)
+    for pattern in _NAME_PATTERNS:
+        matches = pattern.findall(first_part)
         if matches:
             for match in matches:
                 if len(match.split()) >= 2 and len(match) < 50:
                     return match
-    
+
     return "Candidate Name Not Found"
 
+# Experience statements, most specific first. Every run is bounded ({0,n} instead of *)
+# so a long resume without a match cannot trigger quadratic backtracking.
+_YEARS = r'(?<!\d)(\d{1,2})\s{0,3}\+?\s{0,3}years?'
+EXPERIENCE_PATTERNS = [
+    re.compile(_YEARS + r'[\s\w]{0,60}?experience'),
+    re.compile(r'experience[\s\w]{0,40}?\bof[\s\w]{0,20}?' + _YEARS),
+    re.compile(r'(?<!\d)(\d{1,2})\s{0,3}-\s{0,3}(\d{1,2})\s{0,3}years?[\s\w]{0,60}?experience'),
+    re.compile(_YEARS + r'\b'),
+]
+
+_MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+def _date_pattern(name):
+    month = r'(?:' + '|'.join(_MONTHS) + r')[a-z]{0,6}\.?'
+    return (rf'(?:(?P<{name}_month>{month})\s{{0,3}},?\s{{0,3}}|(?P<{name}_num>\d{{1,2}})\s{{0,2}}[/.-]\s{{0,2}})?'
+            rf'(?P<{name}_year>(?:19|20)\d{{2}})')
+
+# "Jan 2018 - Mar 2020", "03/2017 to present", "2015 – 2019"
+DATE_RANGE_RE = re.compile(
+    r'\b' + _date_pattern('start') + r'\s{0,3}(?:-|–|—|to|till|until)\s{0,3}(?:'
+    + _date_pattern('end') + r'|(?P<open>present|current|now|today|date)\b)'
+)
+
+def _month_index(match, name):
+    """Months since year 0 for one side of a date range; January when no month is given"""
+    month = 1
+    if match.group(f'{name}_month'):
+        month = _MONTHS.index(match.group(f'{name}_month')[:3]) + 1
+    elif match.group(f'{name}_num') and 1 <= int(match.group(f'{name}_num')) <= 12:
+        month = int(match.group(f'{name}_num'))
+    return int(match.group(f'{name}_year')) * 12 + month - 1
+
+def employment_months(text):
+    """Total months covered by the employment date ranges in text, overlaps counted once"""
+    today = datetime.now()
+    intervals = []
+    for match in DATE_RANGE_RE.finditer(text.lower()):
+        start = _month_index(match, 'start')
+        if match.group('open'):
+            end = today.year * 12 + today.month
+        else:
+            end = _month_index(match, 'end')
+            # An explicit end month is inclusive ("Jan 2018 - Dec 2018" is 12 months)
+            if match.group('end_month') or match.group('end_num'):
+                end += 1
+        if start < end <= today.year * 12 + today.month and end - start <= 50 * 12:
+            intervals.append((start, end))
+
+    total, covered_until = 0, None
+    for start, end in sorted(intervals):
+        if covered_until is not None:
+            start = max(start, covered_until)
+        if end > start:
+            total += end - start
+        covered_until = end if covered_until is None else max(covered_until, end)
+    return total
+
 def extract_years_of_experience(text):
-    """Extract years of experience from text with improved accuracy"""
-    text_lower = text.lower()
-    
-    # Pattern 1: Direct years of experience
-    patterns = [
-        r'(\d+)\s*\+?\s*years?[\s\w]*experience',
-        r'experience[\s\w]*of[\s\w]*(\d+)\s*\+?\s*years?',
-        r'(\d+)\s*-\s*(\d+)\s*years?[\s\w]*experience',
-        r'(\d+)\s*\+?\s*years?',
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text_lower)
-        if matches:
-            if isinstance(matches[0], tuple):  # Range like "5-7 years"
-                # Get all numbers from tuples and find max
-                numbers = []
-                for match_tuple in matches:
-                    for item in match_tuple:
-                        if item.isdigit():
-                            numbers.append(int(item))
-                if numbers:
-                    return max(numbers)
-            else:
-                # Single number matches
-                numbers = [int(match) for match in matches if match.isdigit()]
-                if numbers:
-                    return max(numbers)
-    
-    # Pattern 2: Date range calculation
-    year_matches = re.findall(r'(19|20)\d{2}', text)
-    if year_matches:
-        years = sorted([int(year) for year in year_matches if 1900 <= int(year) <= 2030])
-        if len(years) >= 2:
-            experience = years[-1] - years[0]
-            return max(0, min(experience, 40))  # Cap at 40 years
-    
-    return 0
+    """Extract years of experience from text (or a parse_resume result) with improved accuracy
+
+    Stated experience ("5+ years of experience") wins; otherwise the employment date
+    ranges are summed, from the Experience section when one is detected and without
+    lines that name a degree or school, so study periods do not count as work.
+    """
+    parsed = _as_parsed(text)
+    text_lower = parsed["text_lower"]
+
+    # Pattern 1: Direct years of experience ("5+ years of experience", "5-7 years")
+    for pattern in EXPERIENCE_PATTERNS:
+        numbers = [int(number) for match in pattern.findall(text_lower)
+                   for number in (match if isinstance(match, tuple) else (match,)) if number.isdigit()]
+        if numbers:
+            return max(numbers)
+
+    # Pattern 2: Sum of employment date ranges
+    _, lines_lower = _section_lines(parsed, 'experience')
+    months = employment_months('\n'.join(line for line in lines_lower if not _EDUCATION_DATE_RE.search(line)))
+    return min(months // 12, 40)  # Cap at 40 years
 
 def extract_current_position(text):
     """Extract current/last position and organization with improved accuracy"""
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    
-    position_keywords = [
-        'manager', 'engineer', 'developer', 'analyst', 'specialist', 'consultant',
-        'director', 'head', 'lead', 'architect', 'officer', 'executive',
-        'president', 'ceo', 'cto', 'cfo', 'vp', 'assistant', 'coordinator'
-    ]
-    
-    company_indicators = [
-        'ltd', 'limited', 'inc', 'corporation', 'corp', 'company', 'group',
-        'technologies', 'solutions', 'systems', 'international', 'global'
-    ]
-    
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        
+    parsed = _as_parsed(text)
+
+    # Prefer the Experience section; fall back to the whole resume
+    position = _find_position(*_section_lines(parsed, 'experience'))
+    if position is None and 'experience' in parsed["sections"]:
+        position = _find_position(parsed["lines"], parsed["lines_lower"])
+    return position or "Position Not Specified"
+
+def _find_position(lines, lines_lower):
+    for i, line_lower in enumerate(lines_lower):
         # Check if line contains position keywords
-        if any(keyword in line_lower for keyword in position_keywords):
-            position_line = line
-            
+        if _POSITION_RE.search(line_lower):
+            position_line = lines[i]
+
             # Look for company in current, previous or next lines
             company_candidates = []
-            
+
             # Check current line for company
-            if any(indicator in line_lower for indicator in company_indicators):
-                company_candidates.append(line)
-            
+            if _COMPANY_RE.search(line_lower):
+                company_candidates.append(position_line)
+
             # Check surrounding lines
             for j in range(max(0, i-2), min(len(lines), i+3)):
                 if j == i:
                     continue
-                candidate_line = lines[j]
-                candidate_lower = candidate_line.lower()
-                if (any(indicator in candidate_lower for indicator in company_indicators) and
-                    len(candidate_line) > 3 and
-                    not any(keyword in candidate_lower for keyword in position_keywords + ['email', 'phone'])):
-                    company_candidates.append(candidate_line)
-            
+                candidate_lower = lines_lower[j]
+                if (_COMPANY_RE.search(candidate_lower) and
+                    len(candidate_lower) > 3 and
+                    not _NOT_COMPANY_RE.search(candidate_lower)):
+                    company_candidates.append(lines[j])
+
             if company_candidates:
                 # Use the closest company candidate
                 company = company_candidates[0]
                 return f"{position_line} | {company}"
             else:
                 return position_line
-    
-    return "Position Not Specified"
+
+    return None
 
 def extract_education(text):
     """Extract educational information with improved accuracy"""
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    
-    education_keywords = [
-        'bachelor', 'bsc', 'bs', 'b.tech', 'btech', 'be',
-        'master', 'msc', 'ms', 'm.tech', 'mtech', 'me', 'mba',
-        'phd', 'ph.d', 'doctorate',
-        'university', 'college', 'institute', 'school',
-        'degree', 'graduated', 'education'
-    ]
-    
-    degree_patterns = [
-        r'\b(bachelor|bsc|bs|b\.?tech|be)\b',
-        r'\b(master|msc|ms|m\.?tech|me|mba)\b',
-        r'\b(phd|ph\.d|doctorate)\b'
-    ]
-    
+    parsed = _as_parsed(text)
+
+    # Prefer the Education section; fall back to the whole resume
+    education_info = _find_education(*_section_lines(parsed, 'education'))
+    if not education_info and 'education' in parsed["sections"]:
+        education_info = _find_education(parsed["lines"], parsed["lines_lower"])
+    return education_info[:2] if education_info else ["Education Not Specified"]
+
+def _find_education(lines, lines_lower):
     education_info = []
-    
-    for i, line in enumerate(lines):
-        line_lower = line.lower()
-        
+    # Institution lines already joined onto an earlier entry are not entries of their own
+    consumed = set()
+
+    for i, line_lower in enumerate(lines_lower):
         # Check for education keywords
-        if any(keyword in line_lower for keyword in education_keywords):
-            education_line = line
-            
+        if i not in consumed and _EDUCATION_RE.search(line_lower):
+            education_line = lines[i]
+
             # Try to find university in current or next line
             university_found = False
             for j in range(i, min(i+3, len(lines))):
-                uni_line = lines[j]
-                if any(word in uni_line.lower() for word in ['university', 'college', 'institute', 'school']):
-                    if uni_line != education_line:
-                        education_line += " | " + uni_line
+                if _INSTITUTION_RE.search(lines_lower[j]):
+                    if lines[j] != education_line:
+                        education_line += " | " + lines[j]
+                        consumed.add(j)
                     university_found = True
                     break
-            
+
             # If no university found, check if current line has degree pattern
             if not university_found:
-                for pattern in degree_patterns:
-                    if re.search(pattern, line_lower):
-                        education_info.append(education_line)
-                        break
+                if _DEGREE_RE.search(line_lower):
+                    education_info.append(education_line)
             else:
                 education_info.append(education_line)
-    
-    return education_info[:2] if education_info else ["Education Not Specified"]
+
+            # Only the first two entries are ever reported
+            if len(education_info) == 2:
+                break
+
+    return education_info
 
 def clean_text_for_similarity(text):
     """Clean and prepare text for semantic analysis"""
     return ' '.join(text.split()[:500])
 
-def generate_general_feedback(match_percentage, missing_skills, total_experience, job_years):
+def split_text_into_chunks(text, chunk_words=180, overlap=40, max_chunks=8):
+    """Split text into overlapping word windows, keeping at most max_chunks of them"""
+    words = text.split()
+    step = max(1, chunk_words - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(' '.join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words) or len(chunks) >= max_chunks:
+            break
+    return chunks
+
+# Minimum match percentages for each feedback band, best band first
+FEEDBACK_THRESHOLDS = (80, 65, 50, 35)
+FEEDBACK_MESSAGES = (
+    "🎯 Strong Match - Highly recommended for immediate interview",
+    "✅ Good Fit - Consider for next round with skill validation",
+    "⚠️ Moderate Fit - May require additional training",
+    "📉 Limited Match - Consider only for junior roles",
+)
+POOR_MATCH_FEEDBACK = "❌ Poor Match - Not recommended for this position"
+
+def generate_general_feedback(match_percentage, missing_skills, total_experience, job_years,
+                              thresholds=FEEDBACK_THRESHOLDS):
     """Generate concise general feedback"""
-    if match_percentage >= 80:
-        return "🎯 Strong Match - Highly recommended for immediate interview"
-    elif match_percentage >= 65:
-        return "✅ Good Fit - Consider for next round with skill validation"
-    elif match_percentage >= 50:
-        return "⚠️ Moderate Fit - May require additional training"
-    elif match_percentage >= 35:
-        return "📉 Limited Match - Consider only for junior roles"
-    else:
-        return "❌ Poor Match - Not recommended for this position"
+    for threshold, message in zip(thresholds, FEEDBACK_MESSAGES):
+        if match_percentage >= threshold:
+            return message
+    return POOR_MATCH_FEEDBACK
@@ -1,21 +1,152 @@
+import os
+import numpy as np
 from step3a_imports import AnalysisState
-from step3b_models import semantic_model
-from step3c_utils import clean_text_for_similarity
-from sentence_transformers import util
+import step3b_models
+from step3b_models import get_semantic_model
+from step3c_utils import clean_text_for_similarity, split_text_into_chunks
+
+# Resume embedding mode: "truncate" embeds the first 500 words (the model itself stops
+# at 256 word-pieces); "chunked" embeds overlapping windows of the whole resume and
+# pools them. Windows are measured in words, ~180 words fitting the model's limit.
+EMBEDDING_MODE = os.environ.get("RESUME_EMBEDDING_MODE", "truncate")
+CHUNK_WORDS = int(os.environ.get("RESUME_CHUNK_WORDS", 180))
+CHUNK_OVERLAP = int(os.environ.get("RESUME_CHUNK_OVERLAP", 40))
+MAX_CHUNKS = int(os.environ.get("RESUME_MAX_CHUNKS", 8))
+# "max": best chunk-to-JD similarity, "topk": mean of the TOP_K best, "mean": mean-pooled embedding
+CHUNK_POOLING = os.environ.get("RESUME_CHUNK_POOLING", "max")
+TOP_K = int(os.environ.get("RESUME_CHUNK_TOP_K", 3))
+
+def embedding_signature():
+    """Short description of the embedding settings, for cache keys"""
+    if EMBEDDING_MODE == "chunked":
+        signature = f"chunked-{CHUNK_WORDS}-{CHUNK_OVERLAP}-{MAX_CHUNKS}-{CHUNK_POOLING}-{TOP_K}"
+    else:
+        signature = "truncate"
+    # Quantized / ONNX embeddings differ slightly from PyTorch ones, so keep them apart
+    if step3b_models.EMBEDDING_BACKEND == "onnx":
+        signature += f"-onnx-{os.path.basename(step3b_models.ONNX_MODEL_FILE)}"
+    elif step3b_models.EMBEDDING_BACKEND != "sentence-transformers":
+        signature += f"-{step3b_models.EMBEDDING_BACKEND}"
+    return signature
+
+def _cos_sim(a, b):
+    """Cosine similarity matrix between the rows of a and the rows of b"""
+    a = np.atleast_2d(np.asarray(a, dtype=np.float32))
+    b = np.atleast_2d(np.asarray(b, dtype=np.float32))
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a @ b.T
+
+def _pool_chunk_similarities(similarities):
+    if CHUNK_POOLING == "topk":
+        return float(np.mean(sorted(similarities, reverse=True)[:TOP_K]))
+    return float(max(similarities))
+
+def resume_texts_for_embedding(resume_text):
+    """Texts to embed for one resume: the truncated text, or its chunks in chunked mode"""
+    resume_clean = clean_text_for_similarity(resume_text)
+    if len(resume_clean) < 10:
+        return []
+    if EMBEDDING_MODE == "chunked":
+        return split_text_into_chunks(resume_text, CHUNK_WORDS, CHUNK_OVERLAP, MAX_CHUNKS)
+    return [resume_clean]
+
+def encode_job_text(job_clean):
+    """Embed cleaned job description text, or None when it is too short to compare"""
+    if len(job_clean) < 10:
+        return None
+    return get_semantic_model().encode(job_clean)
+
+def encode_resume_text(resume_text):
+    """Embed a resume as a vector (or a chunks x dim matrix in chunked mode), None when too short"""
+    texts = resume_texts_for_embedding(resume_text)
+    if not texts:
+        return None
+    if EMBEDDING_MODE == "chunked":
+        return get_semantic_model().encode(texts, batch_size=len(texts))
+    return get_semantic_model().encode(texts[0])
+
+def batch_encode_resumes(resume_texts, batch_size=32):
+    """Embed many resumes with one encode call; same per-resume shapes as encode_resume_text"""
+    texts, owners = [], []
+    for i, resume_text in enumerate(resume_texts):
+        for text in resume_texts_for_embedding(resume_text):
+            texts.append(text)
+            owners.append(i)
+
+    embeddings = [None] * len(resume_texts)
+    if not texts:
+        return embeddings
+
+    encoded = get_semantic_model().encode(texts, batch_size=batch_size)
+    owners = np.asarray(owners)
+    for i in np.unique(owners):
+        rows = encoded[owners == i]
+        embeddings[i] = rows if EMBEDDING_MODE == "chunked" else rows[0]
+    return embeddings
+
+def similarity_from_embeddings(resume_embedding, job_embedding):
+    """Clamped cosine similarity between precomputed resume and job embeddings"""
+    if resume_embedding is None or job_embedding is None:
+        return 0.5
+    resume_embedding = np.asarray(resume_embedding)
+    if resume_embedding.ndim == 2:
+        # Chunked resume: pool the chunk embeddings or the chunk-to-JD similarities
+        if CHUNK_POOLING == "mean":
+            similarity = _cos_sim(resume_embedding.mean(axis=0), job_embedding).item()
+        else:
+            similarity = _pool_chunk_similarities(_cos_sim(resume_embedding, job_embedding).reshape(-1).tolist())
+    else:
+        similarity = _cos_sim(resume_embedding, job_embedding).item()
+    return max(0.1, min(1.0, similarity))
+
+def batch_semantic_similarity(resume_texts, job_embedding, batch_size=32):
+    """Score many resumes against one job embedding with a single batched encode"""
+    similarities = [0.5] * len(resume_texts)
+    if job_embedding is None:
+        return similarities
+
+    # Flatten every resume's texts (one per resume, or its chunks) into one encode call
+    texts, owners = [], []
+    for i, resume_text in enumerate(resume_texts):
+        for text in resume_texts_for_embedding(resume_text):
+            texts.append(text)
+            owners.append(i)
+    if not texts:
+        return similarities
+
+    resume_embeddings = get_semantic_model().encode(texts, batch_size=batch_size)
+    owners = np.asarray(owners)
+    positions, offsets = np.unique(owners, return_index=True)
+
+    if EMBEDDING_MODE == "chunked" and CHUNK_POOLING == "mean":
+        counts = np.diff(np.append(offsets, len(owners)))
+        resume_embeddings = np.add.reduceat(resume_embeddings, offsets, axis=0) / counts[:, None]
+        offsets = np.arange(len(positions))
+
+    # One (n x d) @ (d x 1) product instead of n separate comparisons
+    scores = _cos_sim(resume_embeddings, job_embedding).reshape(-1).tolist()
+    bounds = list(offsets) + [len(scores)]
+
+    for k, i in enumerate(positions):
+        similarity = _pool_chunk_similarities(scores[bounds[k]:bounds[k + 1]])
+        similarities[i] = max(0.1, min(1.0, similarity))
+    return similarities
 
 def semantic_analysis_node(state: AnalysisState) -> AnalysisState:
     """Calculate semantic similarity between resume and job description"""
-    resume_text = state["resume_text"]
-    job_desc = state["job_description"]
+    # Batch runs score every resume up front and pass the result in
+    if state.get("semantic_similarity") is not None:
+        return {"semantic_similarity": state["semantic_similarity"]}
 
-    resume_clean = clean_text_for_similarity(resume_text)
-    job_clean = clean_text_for_similarity(job_desc)
+    prepared_job = state.get("prepared_job")
 
-    if len(resume_clean) < 10 or len(job_clean) < 10:
-        return {"semantic_similarity": 0.5}
+    # Reuse the job embedding when the batch prepared it up front
+    if prepared_job:
+        job_embedding = prepared_job["embedding"]
+    else:
+        job_embedding = encode_job_text(clean_text_for_similarity(state["job_description"]))
 
-    resume_embedding = semantic_model.encode(resume_clean, convert_to_tensor=True)
-    job_embedding = semantic_model.encode(job_clean, convert_to_tensor=True)
-    similarity = util.pytorch_cos_sim(resume_embedding, job_embedding).item()
+    resume_embedding = encode_resume_text(state["resume_text"])
 
-    return {"semantic_similarity": max(0.1, min(1.0, similarity))}
\ No newline at end of file
+    return {"semantic_similarity": similarity_from_embeddings(resume_embedding, job_embedding)}
\ No newline at end of file
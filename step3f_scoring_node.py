@@ -1,17 +1,21 @@
+import numpy as np
+import pandas as pd
 from step3a_imports import AnalysisState
-from step3c_utils import generate_general_feedback
+from step3c_utils import generate_general_feedback, FEEDBACK_THRESHOLDS, FEEDBACK_MESSAGES, POOR_MATCH_FEEDBACK
 
-def calculate_match_score_node(state: AnalysisState) -> AnalysisState:
-    """Calculate overall match percentage using weighted scoring"""
-    keyword_data = state["keyword_matches"]
-    semantic_similarity = state["semantic_similarity"]
+# Weight of each signal in the overall match; rescore() normalizes them to sum to 1
+DEFAULT_WEIGHTS = {"semantic": 0.4, "keyword": 0.3, "experience": 0.3}
+SIGNAL_COLUMNS = list(DEFAULT_WEIGHTS)
 
+def score_signals(keyword_data, semantic_similarity):
+    """The raw per-resume signals the overall match is computed from"""
     required_skills = keyword_data["required_skills"]
     resume_skills = keyword_data["resume_skills"]
     resume_years = keyword_data["resume_years"]
     job_years = keyword_data["job_years"]
 
-    keyword_match_score = len([skill for skill in required_skills if skill in resume_skills]) / len(required_skills) if required_skills else 0.3
+    skill_hits = len([skill for skill in required_skills if skill in resume_skills])
+    keyword_match_score = skill_hits / len(required_skills) if required_skills else 0.3
 
     if job_years > 0 and resume_years >= job_years:
         experience_score = 1.0
@@ -20,17 +24,61 @@ def calculate_match_score_node(state: AnalysisState) -> AnalysisState:
     else:
         experience_score = 0.5
 
-    overall_match = (semantic_similarity * 0.4) + (keyword_match_score * 0.3) + (experience_score * 0.3)
+    return {
+        "semantic": semantic_similarity,
+        "keyword": keyword_match_score,
+        "experience": experience_score,
+        "skill_hits": skill_hits,
+        "required_skill_count": len(required_skills),
+        "resume_years": resume_years,
+        "job_years": job_years
+    }
+
+def calculate_match_score_node(state: AnalysisState) -> AnalysisState:
+    """Calculate overall match percentage using weighted scoring"""
+    keyword_data = state["keyword_matches"]
+    signals = score_signals(keyword_data, state["semantic_similarity"])
+
+    overall_match = sum(signals[name] * weight for name, weight in DEFAULT_WEIGHTS.items())
 
     # Generate general feedback
     general_feedback = generate_general_feedback(
         overall_match * 100,
         keyword_data["missing_skills"],
-        resume_years,
-        job_years
+        signals["resume_years"],
+        signals["job_years"]
     )
 
     return {
         "match_percentage": round(overall_match * 100, 2),
-        "general_feedback": general_feedback
-    }
\ No newline at end of file
+        "general_feedback": general_feedback,
+        "score_signals": signals
+    }
+
+def signals_frame(results):
+    """DataFrame of score signals, one row per analysis result, in the same order
+
+    Results from before signals were stored are recomputed from their keyword matches.
+    """
+    return pd.DataFrame([
+        result.get("score_signals") or score_signals(result["keyword_matches"], result["semantic_similarity"])
+        for result in results
+    ], columns=SIGNAL_COLUMNS + ["skill_hits", "required_skill_count", "resume_years", "job_years"])
+
+def rescore(signals, weights=None, thresholds=FEEDBACK_THRESHOLDS):
+    """Recompute match_percentage and general_feedback for a whole signals frame at once
+
+    Vectorized, so re-ranking thousands of results after a weight or threshold change
+    takes milliseconds and never touches extraction or embeddings. Returns a frame with
+    the same index.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    weight_vector = np.array([weights[name] for name in SIGNAL_COLUMNS], dtype=np.float64)
+    total = weight_vector.sum()
+    weight_vector = weight_vector / total if total > 0 else np.full(len(SIGNAL_COLUMNS), 1 / len(SIGNAL_COLUMNS))
+
+    overall_match = signals[SIGNAL_COLUMNS].to_numpy(dtype=np.float64) @ weight_vector * 100
+    general_feedback = np.select([overall_match >= threshold for threshold in thresholds],
+                                 FEEDBACK_MESSAGES[:len(thresholds)], default=POOR_MATCH_FEEDBACK)
+    return pd.DataFrame({"match_percentage": np.round(overall_match, 2), "general_feedback": general_feedback},
+                        index=signals.index)
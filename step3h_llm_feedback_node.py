@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from step3a_imports import AnalysisState, SystemMessage, HumanMessage
+from step3b_models import get_llm, LLM_MODEL_NAME
+from result_cache import ResultCache, hash_text
+from profiling import instrument
+
+logger = logging.getLogger(__name__)
+
+# Optional AI feedback: off unless LLM_FEEDBACK=1 (or requested by the caller)
+LLM_FEEDBACK_ENABLED = os.environ.get("LLM_FEEDBACK", "0") == "1"
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", 8))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 3))
+LLM_BACKOFF_SECONDS = float(os.environ.get("LLM_BACKOFF_SECONDS", 1.0))
+RESUME_EXCERPT_CHARS = 3000
+
+FEEDBACK_SYSTEM_PROMPT = (
+    "You are an experienced HR recruiter. Given a job description and a candidate's resume "
+    "with automated match results, write 3-5 short bullet points: the candidate's main strengths "
+    "for this role, the most important gaps, and one concrete suggestion. Be factual and concise."
+)
+
+# Sync callers (graph.invoke / graph.batch threads) share one slot pool; async callers get a
+# semaphore per event loop, since an asyncio.Semaphore cannot be shared between loops
+_sync_slots = threading.BoundedSemaphore(LLM_CONCURRENCY)
+_async_slots = weakref.WeakKeyDictionary()
+_default_cache = None
+
+def get_feedback_cache():
+    """The shared on-disk ResultCache used for LLM responses by the graph nodes"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+def build_feedback_messages(state):
+    """Chat messages asking for feedback on one analyzed resume"""
+    keyword_data = state.get("keyword_matches", {})
+    matched = [skill for skill in keyword_data.get("required_skills", []) if skill in keyword_data.get("resume_skills", [])]
+    summary = "\n".join([
+        f"Overall match: {state.get('match_percentage', 'n/a')}%",
+        f"Current position: {state.get('current_position', 'n/a')}",
+        f"Years of experience: {state.get('total_experience', 'n/a')} (job asks for {keyword_data.get('job_years', 'n/a')})",
+        f"Matched skills: {', '.join(matched) or 'None'}",
+        f"Missing skills: {', '.join(keyword_data.get('missing_skills', [])) or 'None'}",
+    ])
+    return [
+        SystemMessage(content=FEEDBACK_SYSTEM_PROMPT),
+        HumanMessage(content=(
+            f"JOB DESCRIPTION:\n{state['job_description'][:RESUME_EXCERPT_CHARS]}\n\n"
+            f"RESUME:\n{state['resume_text'][:RESUME_EXCERPT_CHARS]}\n\n"
+            f"AUTOMATED ANALYSIS:\n{summary}"
+        )),
+    ]
+
+def prompt_hash(messages, model_name=LLM_MODEL_NAME):
+    """Cache key for a prompt: SHA-256 of the model name and every message"""
+    return hash_text(json.dumps([model_name] + [[message.type, message.content] for message in messages]))
+
+def model_name(llm=None):
+    """Name of the chat model a call goes to: LLM_MODEL_NAME for the default model,
+    otherwise what the given model reports (its class name when it reports nothing)"""
+    if llm is None:
+        return LLM_MODEL_NAME
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+# Transport failures of the Groq / OpenAI clients and httpx, matched by class name so
+# none of them has to be imported here
+_RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"}
+
+def _retryable(error):
+    # Rate limits, server errors and connection or timeout failures; anything else
+    # (other client errors, or bugs such as a TypeError) fails the same way again
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+def _backoff_delay(attempt):
+    # Exponential backoff with jitter so parallel requests do not retry in lockstep
+    return LLM_BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random())
+
+def _async_semaphore():
+    loop = asyncio.get_running_loop()
+    if loop not in _async_slots:
+        _async_slots[loop] = asyncio.Semaphore(LLM_CONCURRENCY)
+    return _async_slots[loop]
+
+async def agenerate_feedback(messages, llm=None, cache=None):
+    """Feedback text for a prompt: from the cache, or one bounded, retried async LLM call"""
+    key = prompt_hash(messages, model_name(llm))
+    if cache is not None:
+        cached = cache.get_llm_response(key)
+        if cached is not None:
+            return cached
+
+    llm = llm or get_llm()
+    async with _async_semaphore():
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                response = await llm.ainvoke(messages)
+                break
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _retryable(e):
+                    raise
+                await asyncio.sleep(_backoff_delay(attempt))
+
+    if cache is not None:
+        cache.put_llm_response(key, response.content)
+    return response.content
+
+def generate_feedback(messages, llm=None, cache=None):
+    """Synchronous agenerate_feedback, bounded by a process-wide slot pool"""
+    key = prompt_hash(messages, model_name(llm))
+    if cache is not None:
+        cached = cache.get_llm_response(key)
+        if cached is not None:
+            return cached
+
+    llm = llm or get_llm()
+    with _sync_slots:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                response = llm.invoke(messages)
+                break
+            except Exception as e:
+                if attempt == LLM_MAX_RETRIES or not _retryable(e):
+                    raise
+                time.sleep(_backoff_delay(attempt))
+
+    if cache is not None:
+        cache.put_llm_response(key, response.content)
+    return response.content
+
+def llm_feedback_node(state: AnalysisState) -> AnalysisState:
+    """Add AI-written feedback; a failed call leaves ai_feedback empty instead of failing the resume"""
+    try:
+        return {"ai_feedback": generate_feedback(build_feedback_messages(state), cache=get_feedback_cache())}
+    except Exception as e:
+        logger.warning("LLM feedback failed: %s", e)
+        return {"ai_feedback": ""}
+
+async def allm_feedback_node(state: AnalysisState) -> AnalysisState:
+    """Async llm_feedback_node, used by graph.ainvoke / graph.abatch"""
+    try:
+        return {"ai_feedback": await agenerate_feedback(build_feedback_messages(state), cache=get_feedback_cache())}
+    except Exception as e:
+        logger.warning("LLM feedback failed: %s", e)
+        return {"ai_feedback": ""}
+
+async def agenerate_llm_feedback(results, llm=None, cache=None):
+    """AI feedback for many analyzed results at once, at most LLM_CONCURRENCY calls in flight
+
+    results need resume_text and job_description alongside the analysis fields. Returns
+    one string per result, in order; failed calls give "".
+    """
+    @instrument("llm_feedback")
+    async def one(result):
+        try:
+            return await agenerate_feedback(build_feedback_messages(result), llm=llm, cache=cache)
+        except Exception as e:
+            logger.warning("LLM feedback failed: %s", e)
+            return ""
+    return await asyncio.gather(*(one(result) for result in results))
+
+def generate_llm_feedback(results, llm=None, cache=None):
+    """Blocking wrapper around agenerate_llm_feedback, for threads without an event loop"""
+    return asyncio.run(agenerate_llm_feedback(results, llm=llm, cache=cache))
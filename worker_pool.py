@@ -0,0 +1,170 @@
+import gc
+import os
+import sys
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from step3b_models import get_semantic_model
+from step3c_utils import _extract_text_worker
+
+def pin_torch_threads(threads):
+    """Limit PyTorch's intra-op thread pool, so N workers on N cores do not oversubscribe them
+
+    Only applies when torch is already loaded; ONNX Runtime sessions keep the thread
+    count they were created with.
+    """
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+
+def prepare_fork():
+    """Call before loading the model in a process that will fork workers
+
+    Hugging Face tokenizers refuse their own thread pool in a forked child once the
+    parent has used it, with a warning per worker; turning it off up front avoids both.
+    """
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+def warm_up():
+    """Load the embedding model (and the skill matrix, when semantic skills are on) and run them once"""
+    from resume_analyzer import analyze_batch, prepare_job
+    get_semantic_model()
+    text = "Software Engineer with 5 years of experience in python, sql and project management. " * 3
+    analyze_batch([text], prepare_job(text))
+
+def _init_worker(threads):
+    pin_torch_threads(threads)
+
+def _init_spawned_worker(threads):
+    # A spawned worker starts from a fresh interpreter: pin first, then load everything
+    pin_torch_threads(threads)
+    warm_up()
+    pin_torch_threads(threads)
+
+def _analyze_texts(job, texts, resume_ids):
+    from resume_analyzer import analyze_batch
+    results = analyze_batch(texts, job, batch_size=len(texts), resume_ids=resume_ids)
+    for result in results:
+        result.pop("prepared_job", None)
+    return results
+
+def _analyze_files(job, items, timeout):
+    # Extraction and analysis of one chunk, all inside this worker
+    outcomes, texts, positions = [], [], []
+    for index, content, filename in items:
+        try:
+            text, _ = _extract_text_worker(content, filename, timeout)
+        except Exception as e:
+            outcomes.append({"index": index, "filename": filename, "text": None, "result": None,
+                             "error": f"{type(e).__name__}: {e}"})
+            continue
+        if not text or len(text.strip()) < 50:
+            outcomes.append({"index": index, "filename": filename, "text": text, "result": None,
+                             "error": "insufficient text content"})
+            continue
+        texts.append(text)
+        positions.append((index, filename))
+    if texts:
+        results = _analyze_texts(job, texts, [filename for _, filename in positions])
+        outcomes += [{"index": index, "filename": filename, "text": text, "result": result, "error": None}
+                     for (index, filename), text, result in zip(positions, texts, results)]
+    return outcomes
+
+class PipelinePool:
+    """Worker processes that run the whole pipeline, with the model loaded once
+
+    With the default "fork" start method the model is loaded and warmed up in this
+    process, and workers are forked from it: they inherit the weights copy-on-write
+    instead of each importing torch and loading the model again, and can start work
+    at once. gc.freeze() keeps the garbage collector from touching (and so copying) the
+    inherited objects. "spawn" workers load their own copy; it is kept for platforms
+    without fork and for comparison. Each worker's torch threads are pinned to
+    threads_per_worker (CPU count / processes by default).
+
+    A worker that dies (a parser segfault, an OOM kill) breaks the pool rather than
+    being silently replaced: the pool is started again and the files of the lost chunks
+    are retried one at a time, so only the file that crashes is reported as failed.
+    """
+
+    def __init__(self, processes=None, threads_per_worker=None, start_method="fork"):
+        self.processes = processes or os.cpu_count() or 1
+        self.start_method = start_method
+        self._threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.processes)
+        if start_method == "fork":
+            prepare_fork()
+            warm_up()
+        self._executor = None
+        self._start()
+
+    def _start(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method != "fork":
+            self._executor = ProcessPoolExecutor(self.processes, mp_context=context,
+                                                 initializer=_init_spawned_worker, initargs=(self._threads_per_worker,))
+            return
+        gc.freeze()
+        try:
+            self._executor = ProcessPoolExecutor(self.processes, mp_context=context,
+                                                 initializer=_init_worker, initargs=(self._threads_per_worker,))
+            # A fork-context executor starts all its workers on the first task: do it while frozen
+            self._executor.submit(os.getpid).result()
+        finally:
+            gc.unfreeze()
+
+    def _chunk_size(self, count, batch_size):
+        # Enough chunks to keep every worker busy, each no larger than one embedding batch
+        return max(1, min(batch_size, math.ceil(count / self.processes)))
+
+    def analyze_batch(self, resumes, job, batch_size=32, resume_ids=None):
+        """analyze_batch spread over the workers; results in input order
+
+        Raises BrokenProcessPool if a worker dies (the pool is started again first).
+        """
+        size = self._chunk_size(len(resumes), batch_size)
+        chunks = [(resumes[i:i + size], resume_ids[i:i + size] if resume_ids is not None else None)
+                  for i in range(0, len(resumes), size)]
+        futures = [self._executor.submit(_analyze_texts, job, texts, ids) for texts, ids in chunks]
+        try:
+            return [result for future in futures for result in future.result()]
+        except BrokenProcessPool:
+            self._start()
+            raise
+
+    def analyze_files(self, files, job, batch_size=32, timeout=60):
+        """Extract and analyze (file_content or path, filename) pairs, yielding results as chunks finish
+
+        Each result is a dict with the input index, filename, extracted text, result and error.
+        """
+        items = [(index, content, filename) for index, (content, filename) in enumerate(files)]
+        size = self._chunk_size(len(items), batch_size)
+        futures = {self._executor.submit(_analyze_files, job, items[i:i + size], timeout): items[i:i + size]
+                   for i in range(0, len(items), size)}
+        crashed = []
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except BrokenProcessPool:
+                # Every chunk in flight fails with the worker that died
+                crashed += futures[future]
+        if not crashed:
+            return
+
+        self._start()
+        for index, content, filename in crashed:
+            try:
+                yield from self._executor.submit(_analyze_files, job, [(index, content, filename)], timeout).result()
+            except BrokenProcessPool as e:
+                self._start()
+                yield {"index": index, "filename": filename, "text": None, "result": None,
+                       "error": f"{type(e).__name__}: {e}"}
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()